@@ -1,9 +1,16 @@
 """FastAPI application for QSR World Model"""
 
-from fastapi import FastAPI, HTTPException
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from fastapi import Depends, FastAPI, HTTPException, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-import json
+from fastapi.responses import ORJSONResponse, StreamingResponse
+import asyncio
+import mmap
+import orjson
+import os
+import time
+from collections import OrderedDict
 from pathlib import Path
 from datetime import datetime
 from src.coordinator.orchestrator import QSROrchestrator
@@ -11,18 +18,43 @@ from src.models.schemas import (
     PlanningRequest, PlanningResponse,
     EvaluationRequest, EvaluationResponse
 )
-from src.config.settings import settings
+from src.config.settings import settings, bootstrap
 from src.utils.logger import setup_logger
 from src.utils.llm_utils import LLMQuotaError, LLMServiceError
 from pydantic import ValidationError
+from starlette.background import BackgroundTask
 
 logger = setup_logger(__name__)
 
+# Resolve the results directory once instead of per request
+RESULTS_DIR = Path(settings.results_dir)
+
+def _plan_path(request_id: str) -> Path:
+    return RESULTS_DIR / f"plan_{request_id}.json"
+
+def _eval_path(request_id: str) -> Path:
+    return RESULTS_DIR / f"eval_{request_id}.json"
+
+@lru_cache
+def get_orchestrator() -> QSROrchestrator:
+    """Construct the orchestrator once per worker, on first use"""
+    return QSROrchestrator()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Create data/log directories and warm the orchestrator at startup
+    # (after fork in preload mode)
+    bootstrap()
+    get_orchestrator()
+    yield
+
 # Initialize FastAPI app
 app = FastAPI(
     title="QSR World Model API",
     description="AI-powered QSR operations planning and evaluation",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
 # Configure CORS
@@ -36,14 +68,14 @@ app.add_middleware(
 
 @app.exception_handler(LLMQuotaError)
 async def llm_quota_exception_handler(request, exc: LLMQuotaError):
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=429,
         content={"detail": "The AI model is currently overloaded. Please wait a moment and try again.", "error_type": "quota_exceeded"},
     )
 
 @app.exception_handler(LLMServiceError)
 async def llm_service_exception_handler(request, exc: LLMServiceError):
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=503,
         content={"detail": "AI Service is temporarily unavailable. Please try again later.", "error_type": "service_unavailable"},
     )
@@ -51,22 +83,25 @@ async def llm_service_exception_handler(request, exc: LLMServiceError):
 @app.exception_handler(ValidationError)
 async def validation_exception_handler(request, exc: ValidationError):
     logger.error(f"Validation Error: {exc}")
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=422,
         content={"detail": "The AI generated an invalid response format. Please retry.", "error_type": "parsing_error"},
     )
 
-# Initialize orchestrator
-orchestrator = QSROrchestrator()
+# Timestamp formatted at most once per second; health probes hit / constantly
+_cached_ts = [0.0, ""]
 
 @app.get("/")
 async def root():
     """Health check endpoint"""
+    now = time.time()
+    if now - _cached_ts[0] >= 1.0:
+        _cached_ts[:] = [now, datetime.fromtimestamp(now).isoformat()]
     return {
         "service": "QSR World Model API",
         "status": "operational",
         "version": "1.0.0",
-        "timestamp": datetime.now().isoformat()
+        "timestamp": _cached_ts[1]
     }
 
 
@@ -88,7 +123,7 @@ async def health():
     }
 
 @app.post("/api/v1/plan", response_model=PlanningResponse)
-async def plan_shift(request: PlanningRequest):
+async def plan_shift(request: PlanningRequest, orchestrator: QSROrchestrator = Depends(get_orchestrator)):
     """
     Generate optimal staffing plan for a shift
     
@@ -101,23 +136,28 @@ async def plan_shift(request: PlanningRequest):
     try:
         logger.info(f"Received planning request for {request.scenario.shift.value} shift")
         
-        # Execute planning
-        response = orchestrator.plan_shift(request)
-        
-        # Save result
-        result_file = Path(settings.results_dir) / f"plan_{response.request_id}.json"
-        with open(result_file, 'w') as f:
-            json.dump(response.model_dump(mode='json'), f, indent=2, default=str)
+        # Execute planning (internal agent calls fan out on the event loop)
+        response = await orchestrator.plan_shift(request)
         
-        logger.info(f"Planning complete, saved to {result_file}")
-        return response
+        payload = response.model_dump_json(indent=2).encode()
+        result_file = _plan_path(response.request_id)
+
+        logger.info(f"Planning complete, saving to {result_file}")
+        # Return the already-serialized bytes verbatim, skipping FastAPI's
+        # response_model re-validation pass; the file write happens after the
+        # response has been sent
+        return Response(
+            content=payload,
+            media_type="application/json",
+            background=BackgroundTask(result_file.write_bytes, payload)
+        )
         
     except Exception as e:
         logger.error(f"Planning failed: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/api/v1/evaluate", response_model=EvaluationResponse)
-async def evaluate_shift(request: EvaluationRequest):
+async def evaluate_shift(request: EvaluationRequest, orchestrator: QSROrchestrator = Depends(get_orchestrator)):
     """
     Evaluate a completed shift by comparing prediction vs actual
     
@@ -130,36 +170,59 @@ async def evaluate_shift(request: EvaluationRequest):
     try:
         logger.info(f"Received evaluation request for plan {request.planning_response.request_id}")
         
-        # Execute evaluation
-        response = orchestrator.evaluate_shift(request)
-        
-        # Save result
-        result_file = Path(settings.results_dir) / f"eval_{response.request_id}.json"
-        with open(result_file, 'w') as f:
-            json.dump(response.model_dump(mode='json'), f, indent=2, default=str)
+        # Execute evaluation (agent call is async end to end)
+        response = await orchestrator.evaluate_shift(request)
         
-        logger.info(f"Evaluation complete, saved to {result_file}")
-        return response
+        payload = response.model_dump_json(indent=2).encode()
+        result_file = _eval_path(response.request_id)
+
+        logger.info(f"Evaluation complete, saving to {result_file}")
+        # Return the already-serialized bytes verbatim (see plan_shift)
+        return Response(
+            content=payload,
+            media_type="application/json",
+            background=BackgroundTask(result_file.write_bytes, payload)
+        )
         
     except Exception as e:
         logger.error(f"Evaluation failed: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
+# Memory-mapped result files keyed by path; repeated fetches of the same
+# result (dashboard polling) are served from the OS page cache. Bounded LRU
+# so long-running workers don't exhaust address space.
+_RESULT_CACHE_MAX = 256
+_result_cache: OrderedDict = OrderedDict()
+
+def _read_result_bytes(path: Path) -> bytes:
+    mtime = path.stat().st_mtime
+    cached = _result_cache.get(path)
+    if cached and cached[0] == mtime:
+        _result_cache.move_to_end(path)
+        return bytes(cached[1])
+
+    with open(path, "rb") as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    _result_cache[path] = (mtime, mapped)
+    _result_cache.move_to_end(path)
+    while len(_result_cache) > _RESULT_CACHE_MAX:
+        _, evicted = _result_cache.popitem(last=False)
+        evicted[1].close()
+    return bytes(mapped)
+
 @app.get("/api/v1/results/{request_id}")
 async def get_result(request_id: str):
     """Retrieve a previously saved planning or evaluation result"""
     try:
         # Try planning result
-        plan_file = Path(settings.results_dir) / f"plan_{request_id}.json"
+        plan_file = _plan_path(request_id)
         if plan_file.exists():
-            with open(plan_file, 'r') as f:
-                return json.load(f)
-        
+            return Response(content=_read_result_bytes(plan_file), media_type="application/json")
+
         # Try evaluation result
-        eval_file = Path(settings.results_dir) / f"eval_{request_id}.json"
+        eval_file = _eval_path(request_id)
         if eval_file.exists():
-            with open(eval_file, 'r') as f:
-                return json.load(f)
+            return Response(content=_read_result_bytes(eval_file), media_type="application/json")
         
         raise HTTPException(status_code=404, detail=f"Result not found: {request_id}")
         
@@ -169,31 +232,65 @@ async def get_result(request_id: str):
         logger.error(f"Failed to retrieve result: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+# Parsed summaries keyed by path; result files are immutable once written,
+# so a matching mtime means the cached summary is still valid
+_summary_cache: dict = {}
+
+def _load_plan_summary(plan_file: Path) -> dict:
+    """Read and summarize a single saved plan file, reusing cached summaries"""
+    mtime = plan_file.stat().st_mtime
+    cached = _summary_cache.get(plan_file)
+    if cached and cached[0] == mtime:
+        return cached[1]
+
+    data = orjson.loads(plan_file.read_bytes())
+    summary = {
+        "request_id": data["request_id"],
+        "timestamp": data["timestamp"],
+        "shift": data["scenario"]["shift"],
+        "best_score": data["shadow_operator_best_plan"]["scores"]["overall_score"],
+        "file": plan_file.name
+    }
+    _summary_cache[plan_file] = (mtime, summary)
+    return summary
+
 @app.get("/api/v1/results")
 async def list_results(limit: int = 10):
     """List recent planning results"""
     try:
-        results_dir = Path(settings.results_dir)
-        plan_files = sorted(results_dir.glob("plan_*.json"), key=lambda p: p.stat().st_mtime, reverse=True)
-        
-        results = []
-        for plan_file in plan_files[:limit]:
-            with open(plan_file, 'r') as f:
-                data = json.load(f)
-                results.append({
-                    "request_id": data["request_id"],
-                    "timestamp": data["timestamp"],
-                    "shift": data["scenario"]["shift"],
-                    "best_score": data["shadow_operator_best_plan"]["scores"]["overall_score"],
-                    "file": plan_file.name
-                })
-        
-        return {"results": results, "total": len(results)}
-        
+        # scandir returns DirEntry objects with cached stat info, avoiding a
+        # second stat() syscall per file during the mtime sort
+        with os.scandir(settings.results_dir) as it:
+            entries = [e for e in it if e.name.startswith("plan_") and e.name.endswith(".json")]
+        entries.sort(key=lambda e: e.stat().st_mtime, reverse=True)
+        plan_files = [Path(e.path) for e in entries[:limit]]
+
     except Exception as e:
         logger.error(f"Failed to list results: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+    async def stream_results():
+        # Kick off all reads up front, then emit entries in order as they land
+        tasks = [asyncio.create_task(asyncio.to_thread(_load_plan_summary, p)) for p in plan_files]
+        yield b'{"results":['
+        emitted = 0
+        for path, task in zip(plan_files, tasks):
+            # Unreadable or legacy files (e.g. plans saved before the
+            # shadow-plan summary fields existed) are skipped; the 200 is
+            # already on the wire here, so raising would truncate the body
+            try:
+                summary = await task
+            except Exception as e:
+                logger.warning(f"Skipping unreadable plan file {path.name}: {e}")
+                continue
+            if emitted:
+                yield b","
+            emitted += 1
+            yield orjson.dumps(summary)
+        yield b'],"total":%d}' % emitted
+
+    return StreamingResponse(stream_results(), media_type="application/json")
+
 if __name__ == "__main__":
     import uvicorn
     import argparse
@@ -210,5 +307,7 @@ if __name__ == "__main__":
         host=args.host,
         port=args.port,
         reload=args.reload,
-        log_level=settings.log_level.lower()
+        log_level=settings.log_level.lower(),
+        loop="uvloop",
+        http="httptools"
     )
@@ -1,5 +1,6 @@
 """CLI Terminal Interface for QSR World Model"""
 
+import asyncio
 import click
 import json
 from datetime import date, datetime
@@ -14,14 +15,18 @@ from src.models.schemas import (
     Constraints, AlignmentTargets, ShiftType, WeatherType,
     EvaluationRequest, PlanningResponse, ActualPerformanceData
 )
-from src.config.settings import settings
+from src.config.settings import settings, bootstrap
 
-console = Console()
+# Skip rich's regex auto-highlight pass; explicit markup styles everything we print
+console = Console(highlight=False)
 
 @click.group()
 def cli():
     """QSR World Model - AI-powered staffing optimization"""
-    pass
+    # The API creates the data/results/log directories in its lifespan;
+    # the CLI is its own entry point and must do the same before any
+    # command tries to write results
+    bootstrap()
 
 @cli.command()
 @click.option('--shift', type=click.Choice(['breakfast', 'lunch', 'dinner']), required=True, help='Shift type')
@@ -91,7 +96,7 @@ def plan(shift, weather, day, location, events, available_staff, target_labor, t
         orchestrator = QSROrchestrator()
         
         with console.status("[bold green]Planning in progress..."):
-            response = orchestrator.plan_shift(request)
+            response = asyncio.run(orchestrator.plan_shift(request))
         
         console.print("[green]✓ Planning complete![/green]\n")
         
@@ -178,14 +183,12 @@ def plan(shift, weather, day, location, events, available_staff, target_labor, t
         # Save to file if requested
         if output:
             output_path = Path(output)
-            with open(output_path, 'w') as f:
-                json.dump(response.model_dump(mode='json'), f, indent=2, default=str)
+            output_path.write_bytes(response.model_dump_json(indent=2).encode())
             console.print(f"[green]✓ Results saved to {output_path}[/green]\n")
         else:
             # Save to default location
             result_file = Path(settings.results_dir) / f"plan_{response.request_id}.json"
-            with open(result_file, 'w') as f:
-                json.dump(response.model_dump(mode='json'), f, indent=2, default=str)
+            result_file.write_bytes(response.model_dump_json(indent=2).encode())
             console.print(f"[dim]Results saved to {result_file}[/dim]\n")
         
     except Exception as e:
@@ -205,12 +208,8 @@ def evaluate(plan_file, customers, revenue, wait_time, labor_cost, issues):
     console.print("\n[bold blue]🔍 QSR World Model - Evaluation[/bold blue]\n")
     
     try:
-        # Load planning result
-        with open(plan_file, 'r') as f:
-            plan_data = json.load(f)
-        
-        # Convert to PlanningResponse
-        planning_response = PlanningResponse(**plan_data)
+        # Load planning result straight into the model (single-pass parse)
+        planning_response = PlanningResponse.model_validate_json(Path(plan_file).read_bytes())
         
         # Build actual data
         actual_data = ActualPerformanceData(
@@ -249,7 +248,7 @@ def evaluate(plan_file, customers, revenue, wait_time, labor_cost, issues):
         )
         
         with console.status("[bold green]Evaluating..."):
-            eval_response = orchestrator.evaluate_shift(request)
+            eval_response = asyncio.run(orchestrator.evaluate_shift(request))
         
         console.print("[green]✓ Evaluation complete![/green]\n")
         
@@ -287,8 +286,7 @@ def evaluate(plan_file, customers, revenue, wait_time, labor_cost, issues):
         
         # Save
         result_file = Path(settings.results_dir) / f"eval_{eval_response.request_id}.json"
-        with open(result_file, 'w') as f:
-            json.dump(eval_response.model_dump(mode='json'), f, indent=2, default=str)
+        result_file.write_bytes(eval_response.model_dump_json(indent=2).encode())
         console.print(f"[dim]Evaluation saved to {result_file}[/dim]\n")
         
     except Exception as e:
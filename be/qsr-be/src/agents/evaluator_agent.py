@@ -1,27 +1,21 @@
 """Evaluator Agent - Compares predictions vs actual performance"""
 
-import json
-from google import genai
+import time
+from typing import List, Tuple
 from src.models.schemas import (
     OptionEvaluation, ActualPerformanceData, EvaluationResult
 )
 from src.config.settings import settings
 from src.utils.logger import setup_logger
+from src.utils.genai_client import get_client
+from src.utils.llm_utils import retry_llm_call, create_prompt_cache, dump_json_cached, parse_model_fast, LLMServiceError
+from src.utils.semantic_cache import SemanticCache
+from src.utils.llm_cache import cached_generate
 
 logger = setup_logger(__name__)
 
-class EvaluatorAgent:
-    """
-    Agent that compares AI predictions against actual operational results
-    and identifies what the model got wrong
-    """
-    
-    def __init__(self):
-        self.client = genai.Client(api_key=settings.google_api_key)
-        self.system_prompt = self._build_system_prompt()
-        
-    def _build_system_prompt(self) -> str:
-        return """You are a QSR Performance Evaluator Agent. You compare AI predictions against actual operational results to identify model errors and suggest improvements.
+# Static system prompt; built once at import time
+_SYSTEM_PROMPT = """You are a QSR Performance Evaluator Agent. You compare AI predictions against actual operational results to identify model errors and suggest improvements.
 
 ROLE: Analyze prediction accuracy and extract learning insights.
 
@@ -63,7 +57,28 @@ EVALUATION PROCESS:
 
 Be specific, data-driven, and actionable."""
 
-    def evaluate(
+# JSON schema dict is rebuilt on every model_json_schema() call; hoist it
+_EVAL_SCHEMA = EvaluationResult.model_json_schema()
+
+# Evaluation prompts differ only in metric values; near-duplicate shifts
+# reuse the prior analysis instead of a fresh LLM call
+_semantic_cache = SemanticCache()
+
+class EvaluatorAgent:
+    """
+    Agent that compares AI predictions against actual operational results
+    and identifies what the model got wrong
+    """
+    
+    def __init__(self):
+        self.client = get_client()
+        self.system_prompt = _SYSTEM_PROMPT
+        self.cache_name = create_prompt_cache(
+            self.client, settings.gemini_model, self.system_prompt, "evaluator"
+        )
+
+    @retry_llm_call()
+    async def evaluate(
         self,
         prediction: OptionEvaluation,
         actual_data: ActualPerformanceData
@@ -79,34 +94,111 @@ Be specific, data-driven, and actionable."""
             EvaluationResult with analysis and improvements
         """
         logger.info("Evaluating prediction vs actual performance")
-        
+
         try:
             # Build prompt
-            user_prompt = f"""
-AI PREDICTION:
-Staffing: {prediction.option.staffing.model_dump_json(indent=2)}
-Predicted Metrics: {prediction.simulation.predicted_metrics.model_dump_json(indent=2)}
-Predicted Score: {prediction.scores.overall_score}
+            user_prompt = self._build_user_prompt(prediction, actual_data)
 
-ACTUAL RESULTS:
-{actual_data.model_dump_json(indent=2)}
+            cached = _semantic_cache.get(user_prompt)
+            if cached is not None:
+                return cached
 
-Analyze the prediction accuracy. Calculate errors, identify root causes, and suggest model improvements.
+            config = {
+                "temperature": settings.temperature * 0.7,  # Lower temp for analysis
+                "max_output_tokens": settings.max_output_tokens,
+                "response_mime_type": "application/json",
+                "response_json_schema": _EVAL_SCHEMA,
+            }
+            if self.cache_name:
+                config["cached_content"] = self.cache_name
+                contents = [user_prompt]
+            else:
+                contents = [self.system_prompt, user_prompt]
 
-Return response in the specified JSON format."""
-            
-            response = self.client.models.generate_content(
+            text = await cached_generate(
+                self.client,
                 model=settings.gemini_model,
-                contents=[self.system_prompt, user_prompt],
-                config={
-                    "temperature": settings.temperature * 0.7,  # Lower temp for analysis
-                    "max_output_tokens": settings.max_output_tokens,
-                    "response_mime_type": "application/json",
-                    "response_json_schema": EvaluationResult.model_json_schema(),
-                }
+                contents=contents,
+                config=config
             )
-            
-            return EvaluationResult.model_validate_json(response.text)
+
+            result = parse_model_fast(EvaluationResult, text)
+            _semantic_cache.put(user_prompt, result)
+            return result
         except Exception as e:
             logger.error(f"Evaluation failed: {e}")
             raise
+
+    def _build_user_prompt(
+        self,
+        prediction: OptionEvaluation,
+        actual_data: ActualPerformanceData
+    ) -> str:
+        # Scores carries components only; the overall score is derived
+        # locally (same average the orchestrator uses for plan selection)
+        overall_score = (
+            prediction.scores.profit.raw_score
+            + prediction.scores.customer_satisfaction.raw_score
+            + prediction.scores.staff_wellbeing.raw_score
+        ) / 3
+        return f"""
+AI PREDICTION:
+Staffing: {dump_json_cached(prediction.option.staffing)}
+Predicted Metrics: {dump_json_cached(prediction.simulation.predicted_metrics)}
+Predicted Score: {overall_score:.3f}
+
+ACTUAL RESULTS:
+{dump_json_cached(actual_data)}
+
+Analyze the prediction accuracy. Calculate errors, identify root causes, and suggest model improvements.
+
+Return response in the specified JSON format."""
+
+    def evaluate_batch(
+        self,
+        pairs: List[Tuple[OptionEvaluation, ActualPerformanceData]],
+        poll_interval: float = 30.0
+    ) -> List[EvaluationResult]:
+        """
+        Evaluate many prediction/actual pairs through the Gemini Batch API.
+
+        Batch requests are billed at a discount and processed concurrently
+        server-side, at the cost of minutes-scale turnaround - a good fit
+        for offline post-hoc analysis of many shifts. Use `evaluate()` for
+        real-time paths.
+        """
+        logger.info(f"Submitting batch evaluation of {len(pairs)} shifts")
+
+        inline_requests = [
+            {
+                "contents": [{
+                    "role": "user",
+                    "parts": [{"text": f"{self.system_prompt}\n\n{self._build_user_prompt(prediction, actual)}"}],
+                }],
+                "config": {
+                    "temperature": settings.temperature * 0.7,
+                    "response_mime_type": "application/json",
+                    "response_json_schema": _EVAL_SCHEMA,
+                },
+            }
+            for prediction, actual in pairs
+        ]
+
+        job = self.client.batches.create(model=settings.gemini_model, src=inline_requests)
+
+        delay = poll_interval
+        while True:
+            job = self.client.batches.get(name=job.name)
+            state = getattr(job.state, "name", str(job.state))
+            if state == "JOB_STATE_SUCCEEDED":
+                break
+            if state in ("JOB_STATE_FAILED", "JOB_STATE_CANCELLED", "JOB_STATE_EXPIRED"):
+                raise LLMServiceError(f"Batch evaluation job {job.name} ended in state {state}")
+            logger.info(f"Batch job {job.name} is {state}; polling again in {delay:.0f}s")
+            time.sleep(delay)
+            delay = min(delay * 1.5, 300.0)
+
+        return [
+            parse_model_fast(EvaluationResult, item.response.text)
+            for item in job.dest.inlined_responses
+        ]
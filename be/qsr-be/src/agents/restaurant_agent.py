@@ -1,26 +1,20 @@
 """Restaurant Model Agent - Analyzes restaurant capabilities"""
 
-import json
-from google import genai
+import hashlib
+import threading
+from collections import OrderedDict
 from typing import Dict, Any
 from src.models.schemas import RestaurantConfig, CapacityAnalysis
 from src.config.settings import settings
 from src.utils.logger import setup_logger
+from src.utils.llm_utils import retry_llm_call, dump_json_cached, parse_model_fast
+from src.utils.llm_cache import cached_generate
+from src.utils.genai_client import get_client
 
 logger = setup_logger(__name__)
 
-class RestaurantModelAgent:
-    """
-    Agent that acts as the 'Digital Twin' of the specific restaurant location.
-    It interprets infrastructure capabilities and constraints.
-    """
-    
-    def __init__(self):
-        self.client = genai.Client(api_key=settings.google_api_key)
-        self.system_prompt = self._build_system_prompt()
-        
-    def _build_system_prompt(self) -> str:
-        return """You are the Restaurant Infrastructure Model. Your job is to calculate maximum theoretical throughput and operational constraints based on physical specs.
+# Static system prompt; built once at import time
+_SYSTEM_PROMPT = """You are the Restaurant Infrastructure Model. Your job is to calculate maximum theoretical throughput and operational constraints based on physical specs.
 
 INPUT: Restaurant configuration (kitchen size, drive-thru lanes, seating).
 
@@ -33,32 +27,91 @@ LOGIC:
 
 """
 
-    def analyze_capacity(self, config: RestaurantConfig) -> CapacityAnalysis:
+# Deterministic capacity model (mirrors the spec in _SYSTEM_PROMPT)
+_KITCHEN_CAPACITY = {"small": 40, "medium": 80, "large": 120}
+_DRIVE_THRU_PER_LANE = 30
+_DINE_IN_TURNOVER_PER_HOUR = 1
+
+# JSON schema dict is rebuilt on every model_json_schema() call; hoist it
+_CAPACITY_SCHEMA = CapacityAnalysis.model_json_schema()
+
+# analyze_capacity is a pure function of the config, and the same restaurant
+# is analyzed once per shift - cache results process-wide, keyed by a stable
+# hash of the serialized config (module-level so it survives agent instances)
+_CAPACITY_CACHE_MAX = 256
+_capacity_cache: "OrderedDict[str, CapacityAnalysis]" = OrderedDict()
+_capacity_cache_lock = threading.Lock()
+
+def _config_cache_key(config: RestaurantConfig) -> str:
+    return hashlib.blake2b(config.model_dump_json().encode(), digest_size=16).hexdigest()
+
+class RestaurantModelAgent:
+    """
+    Agent that acts as the 'Digital Twin' of the specific restaurant location.
+    It interprets infrastructure capabilities and constraints.
+    """
+
+    def __init__(self):
+        self.client = get_client()
+        self.system_prompt = _SYSTEM_PROMPT
+
+    async def analyze_capacity(self, config: RestaurantConfig) -> CapacityAnalysis:
         """
         Analyze the restaurant's physical capacity limits.
+
+        The capacity spec is fully deterministic (kitchen tier lookup,
+        per-lane drive-thru rate, seating x turnover), so by default it is
+        computed in pure Python. Set `capacity_use_llm` for configs with
+        unusual specs that need model judgement.
         """
+        key = _config_cache_key(config)
+        with _capacity_cache_lock:
+            cached = _capacity_cache.get(key)
+            if cached is not None:
+                _capacity_cache.move_to_end(key)
+                return cached
+
+        if settings.capacity_use_llm:
+            analysis = await self._analyze_capacity_llm(config)
+        else:
+            analysis = self._analyze_capacity_deterministic(config)
+
+        with _capacity_cache_lock:
+            _capacity_cache[key] = analysis
+            if len(_capacity_cache) > _CAPACITY_CACHE_MAX:
+                _capacity_cache.popitem(last=False)
+        return analysis
+
+    def _analyze_capacity_deterministic(self, config: RestaurantConfig) -> CapacityAnalysis:
         logger.info(f"Analyzing capacity for {config.location}")
-        
-        try:
-            user_prompt = f"""
-RESTAURANT CONFIG:
-{config.model_dump_json(indent=2)}
 
-Calculate the operational capacity limits.
-"""
-            response = self.client.models.generate_content(
-                model=settings.gemini_model,
-                contents=[self.system_prompt, user_prompt],
-                config={
-                    "temperature": 0.2,
-                    "max_output_tokens": 1024,
-                    "response_mime_type": "application/json",
-                    "response_json_schema": CapacityAnalysis.model_json_schema(),
-                }
+        kitchen = _KITCHEN_CAPACITY.get(config.kitchen_staff_capacity, 80)
+        drive_thru = _DRIVE_THRU_PER_LANE * (config.drive_thru_lanes or 0) if config.has_drive_thru else 0
+        dine_in = (config.dine_in_seat_capacity or 0) * _DINE_IN_TURNOVER_PER_HOUR if config.dine_in else 0
+        stations = {"kitchen": kitchen, "drive_thru": drive_thru, "front_counter": dine_in}
+
+        # Every order clears the kitchen and leaves through a service channel
+        max_throughput = min(kitchen, drive_thru + dine_in)
+        active = {name: cap for name, cap in stations.items() if cap > 0}
+        bottleneck = min(active, key=active.get) if active else "kitchen"
+
+        return CapacityAnalysis(
+            max_throughput_per_hour=max_throughput,
+            station_capacities=stations,
+            bottleneck_risk_areas=[bottleneck],
+            reasoning=(
+                f"Deterministic capacity model: kitchen ({config.kitchen_staff_capacity}) "
+                f"handles {kitchen}/hr, drive-thru {drive_thru}/hr, dine-in {dine_in}/hr; "
+                f"throughput limited to {max_throughput}/hr by the smallest path."
             )
-            
-            return CapacityAnalysis.model_validate_json(response.text)
-            
+        )
+
+    async def _analyze_capacity_llm(self, config: RestaurantConfig) -> CapacityAnalysis:
+        """LLM-based capacity analysis, kept as an opt-in override."""
+        logger.info(f"Analyzing capacity for {config.location}")
+
+        try:
+            return await self._generate_capacity(config)
         except Exception as e:
             logger.error(f"Capacity analysis failed: {e}")
             return CapacityAnalysis(
@@ -67,3 +120,27 @@ Calculate the operational capacity limits.
                 bottleneck_risk_areas=["Default fallback capacities used"],
                 reasoning="Fallback due to error"
             )
+
+    @retry_llm_call()
+    async def _generate_capacity(self, config: RestaurantConfig) -> CapacityAnalysis:
+        user_prompt = f"""
+RESTAURANT CONFIG:
+{dump_json_cached(config)}
+
+Calculate the operational capacity limits.
+"""
+        text = await cached_generate(
+            self.client,
+            model=settings.gemini_model,
+            contents=[self.system_prompt, user_prompt],
+            config={
+                "temperature": 0.2,
+                # CapacityAnalysis is a small fixed-shape object; a tight
+                # cap shortens worst-case decode and discourages rambling
+                "max_output_tokens": 512,
+                "response_mime_type": "application/json",
+                "response_json_schema": _CAPACITY_SCHEMA,
+            }
+        )
+
+        return parse_model_fast(CapacityAnalysis, text)
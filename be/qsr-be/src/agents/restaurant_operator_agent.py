@@ -1,29 +1,20 @@
 """Restaurant Operator Agent - Proposes initial staffing plan based on human tendency"""
 
-import json
-from google import genai
-from typing import Optional
+import asyncio
+from typing import AsyncIterator, List, Optional, Tuple
 from src.models.schemas import (
     Scenario, Constraints, StaffingPlan, Staffing, RiskLevel
 )
 from src.config.settings import settings
 from src.utils.logger import setup_logger
-from src.utils.llm_utils import retry_llm_call
+from src.utils.genai_client import get_client
+from src.utils.llm_utils import retry_llm_call, create_prompt_cache, dump_json_cached
+from src.utils.llm_cache import cached_generate
 
 logger = setup_logger(__name__)
 
-class RestaurantOperatorAgent:
-    """
-    Agent that mimics a standard restaurant operator's initial decision-making.
-    Proposes a single staffing plan based on priority and scenario.
-    """
-    
-    def __init__(self):
-        self.client = genai.Client(api_key=settings.google_api_key)
-        self.system_prompt = self._build_system_prompt()
-        
-    def _build_system_prompt(self) -> str:
-        return """You are a QSR Restaurant Operator making an initial staffing decision. 
+# Static system prompt; built once at import time
+_SYSTEM_PROMPT = """You are a QSR Restaurant Operator making an initial staffing decision. 
 You represent the "actual tendency" of a real-world operator which might be influenced by specific biases or priorities (e.g. cost-cutting, or safety-first).
 
 ROLE: Your goal is to generate exactly ONE initial staffing plan for a restaurant shift.
@@ -46,8 +37,24 @@ REASONING GUIDELINES:
 
 """
 
+# JSON schema dict is rebuilt on every model_json_schema() call; hoist it
+_STAFFING_PLAN_SCHEMA = StaffingPlan.model_json_schema()
+
+class RestaurantOperatorAgent:
+    """
+    Agent that mimics a standard restaurant operator's initial decision-making.
+    Proposes a single staffing plan based on priority and scenario.
+    """
+    
+    def __init__(self):
+        self.client = get_client()
+        self.system_prompt = _SYSTEM_PROMPT
+        self.cache_name = create_prompt_cache(
+            self.client, settings.gemini_model, self.system_prompt, "restaurant_operator"
+        )
+
     @retry_llm_call()
-    def generate_initial_plan(
+    async def generate_initial_plan(
         self,
         scenario: Scenario,
         constraints: Constraints,
@@ -60,12 +67,36 @@ REASONING GUIDELINES:
         logger.info(f"Generating initial operator plan for {scenario.shift.value} shift")
         
         try:
-            user_prompt = f"""
+            contents, config = self._build_request(
+                scenario, constraints, operator_priority, context
+            )
+
+            text = await cached_generate(
+                self.client,
+                model=settings.gemini_model,
+                contents=contents,
+                config=config
+            )
+
+            return StaffingPlan.model_validate_json(text)
+            
+        except Exception as e:
+            logger.error(f"Failed to generate initial operator plan: {e}")
+            raise
+
+    def _build_request(
+        self,
+        scenario: Scenario,
+        constraints: Constraints,
+        operator_priority: str,
+        context: Optional[str]
+    ) -> Tuple[list, dict]:
+        user_prompt = f"""
 SCENARIO:
-{scenario.model_dump_json(indent=2)}
+{dump_json_cached(scenario)}
 
 CONSTRAINTS:
-{constraints.model_dump_json(indent=2)}
+{dump_json_cached(constraints)}
 
 CONTEXT:
 {context if context else "None provided"}
@@ -74,19 +105,73 @@ OPERATOR PRIORITY: {operator_priority}
 
 Generate exactly ONE staffing plan in the specified JSON format.
 """
-            response = self.client.models.generate_content(
-                model=settings.gemini_model,
-                contents=[self.system_prompt, user_prompt],
-                config={
-                    "temperature": settings.temperature,
-                    "max_output_tokens": 8192,
-                    "response_mime_type": "application/json",
-                    "response_json_schema": StaffingPlan.model_json_schema(),
-                }
+        config = {
+            "temperature": settings.temperature,
+            "max_output_tokens": 8192,
+            "response_mime_type": "application/json",
+            "response_json_schema": _STAFFING_PLAN_SCHEMA,
+        }
+        if self.cache_name:
+            config["cached_content"] = self.cache_name
+            contents = [user_prompt]
+        else:
+            contents = [self.system_prompt, user_prompt]
+        return contents, config
+
+    async def generate_initial_plan_stream(
+        self,
+        scenario: Scenario,
+        constraints: Constraints,
+        operator_priority: str = "minimize_cost",
+        context: Optional[str] = None
+    ) -> AsyncIterator[str]:
+        """
+        Stream the staffing plan JSON as it is decoded.
+
+        First tokens arrive in a fraction of the full-response time, so
+        user-facing callers can render progress immediately instead of
+        waiting out the whole generation. Yields raw text chunks; buffer
+        and `StaffingPlan.model_validate_json("".join(chunks))` for the
+        parsed plan, or use `generate_initial_plan` for the blocking path.
+        """
+        logger.info(f"Streaming operator plan for {scenario.shift.value} shift")
+
+        contents, config = self._build_request(
+            scenario, constraints, operator_priority, context
+        )
+
+        async for chunk in await self.client.aio.models.generate_content_stream(
+            model=settings.gemini_model,
+            contents=contents,
+            config=config
+        ):
+            if chunk.text:
+                yield chunk.text
+
+    async def generate_plan_options(
+        self,
+        scenario: Scenario,
+        constraints: Constraints,
+        operator_priorities: List[str],
+        context: Optional[str] = None
+    ) -> List[StaffingPlan]:
+        """
+        Generate one plan per operator priority, concurrently.
+
+        Decode time scales roughly linearly with output length, so N
+        parallel single-plan generations finish in about the wall time of
+        one, and each request reuses the cached system prompt. Results are
+        returned in the same order as `operator_priorities`.
+        """
+        logger.info(
+            f"Generating {len(operator_priorities)} operator plan options for {scenario.shift.value} shift"
+        )
+        return await asyncio.gather(*[
+            self.generate_initial_plan(
+                scenario=scenario,
+                constraints=constraints,
+                operator_priority=priority,
+                context=context
             )
-            
-            return StaffingPlan.model_validate_json(response.text)
-            
-        except Exception as e:
-            logger.error(f"Failed to generate initial operator plan: {e}")
-            raise
+            for priority in operator_priorities
+        ])
@@ -1,29 +1,21 @@
 """Scorer Agent - Evaluates and scores simulation outcomes"""
 
-import json
-from google import genai
+from typing import List
+from pydantic import TypeAdapter
 from src.models.schemas import (
     Scenario, StaffingPlan, SimulationResult, 
     AlignmentTargets, Scores, ScoreDetails
 )
 from src.config.settings import settings
 from src.utils.logger import setup_logger
-from src.utils.llm_utils import retry_llm_call
+from src.utils.genai_client import get_client
+from src.utils.llm_utils import retry_llm_call, create_prompt_cache, dump_json_cached
+from src.utils.llm_cache import cached_generate
 
 logger = setup_logger(__name__)
 
-class ScorerAgent:
-    """
-    Agent that evaluates simulation results based on target alignment.
-    Scores represent proximity to operational targets (1.0 = Perfect match or Better).
-    """
-    
-    def __init__(self):
-        self.client = genai.Client(api_key=settings.google_api_key)
-        self.system_prompt = self._build_system_prompt()
-        
-    def _build_system_prompt(self) -> str:
-        return """You are a QSR Scoring Agent. Your goal is to evaluate if a staffing plan meets specific OPERATIONAL TARGETS.
+# Static system prompt; built once at import time
+_SYSTEM_PROMPT = """You are a QSR Scoring Agent. Your goal is to evaluate if a staffing plan meets specific OPERATIONAL TARGETS.
 
 ROLE: Analyze metrics and provide objective scores based on alignment with specified targets.
 
@@ -62,8 +54,41 @@ IMPORTANT:
 - DO NOT return an 'overall_score' field.
 """
 
-    @retry_llm_call()
-    def score_option(
+_SCORES_LIST = TypeAdapter(List[Scores])
+
+# A Scores object is well under 1 KB; a tight per-option budget finishes
+# decode earlier and caps cost on runaway reasoning. The response is one
+# array for the whole batch, so the request cap scales with option count.
+_MAX_OUTPUT_TOKENS_PER_OPTION = 1024
+
+# JSON schema dict is rebuilt on every model_json_schema() call; hoist it
+_SCORES_ARRAY_SCHEMA = {
+    "type": "array",
+    "items": Scores.model_json_schema(),
+}
+
+class ScorerAgent:
+    """
+    Agent that evaluates simulation results based on target alignment.
+    Scores represent proximity to operational targets (1.0 = Perfect match or Better).
+    """
+    
+    def __init__(self):
+        self.client = get_client()
+        self.model = settings.scorer_model or settings.gemini_model
+        self.system_prompt = _SYSTEM_PROMPT
+        self.cache_name = create_prompt_cache(
+            self.client, self.model, self.system_prompt, "scorer"
+        )
+        # Invariant per-call config, copied (not rebuilt) on each request;
+        # max_output_tokens is filled in per call from the option count
+        self._base_config = {
+            "temperature": settings.scorer_temperature,
+            "response_mime_type": "application/json",
+            "response_json_schema": _SCORES_ARRAY_SCHEMA,
+        }
+
+    async def score_option(
         self,
         scenario: Scenario,
         option: StaffingPlan,
@@ -73,39 +98,179 @@ IMPORTANT:
         """
         Score a single staffing option outcome against targets
         """
+        scores = await self.score_options(
+            scenario, [option], [simulation], alignment_targets
+        )
+        return scores[0]
+
+    async def score_options(
+        self,
+        scenario: Scenario,
+        options: List[StaffingPlan],
+        simulations: List[SimulationResult],
+        alignment_targets: AlignmentTargets
+    ) -> List[Scores]:
+        """
+        Score staffing options against targets. Returns Scores in the same
+        order as `options`.
+
+        The scoring spec is closed-form arithmetic over three predicted
+        metrics, so by default scores are computed in pure Python - the
+        whole stage costs microseconds and zero tokens. Set
+        `scorer_use_llm` to route through the model instead.
+        """
+        if not settings.scorer_use_llm:
+            return [
+                self._score_deterministic(option, simulation, alignment_targets)
+                for option, simulation in zip(options, simulations)
+            ]
+        return await self._score_options_llm(
+            scenario, options, simulations, alignment_targets
+        )
+
+    def _score_deterministic(
+        self,
+        option: StaffingPlan,
+        simulation: SimulationResult,
+        targets: AlignmentTargets
+    ) -> Scores:
+        """Closed-form scoring (mirrors the formulas in _SYSTEM_PROMPT)."""
         logger.info(f"Scoring option: {option.id}")
-        
-        try:
-            # Build prompt
-            user_prompt = f"""
-SCENARIO:
-{scenario.model_dump_json(indent=2)}
+        metrics = simulation.predicted_metrics
+
+        # Profit: labor cost %, lower is better, -0.1 per 1% over target
+        labor_pct = (metrics.labor_cost / metrics.revenue * 100) if metrics.revenue else 100.0
+        profit_dev = labor_pct - targets.target_labor_cost_percent
+        profit_raw = 1.0 if profit_dev <= 0 else max(0.0, 1.0 - profit_dev / 10)
+
+        # Customer satisfaction: avg wait time, lower is better
+        wait_dev = metrics.avg_wait_time_seconds - targets.target_wait_time_seconds
+        csat_raw = 1.0 if wait_dev <= 0 else max(0.0, 1.0 - wait_dev / 60)
+
+        # Staff wellbeing: utilization, deviation in either direction penalized
+        util_dev = metrics.staff_utilization - targets.target_staff_utilization
+        staff_raw = max(0.0, 1.0 - abs(util_dev) / 0.15)
+
+        overall = (profit_raw + csat_raw + staff_raw) / 3
+        ranking = self._rank(overall)
+
+        components = {
+            "profit": (profit_raw, "labor cost percentage"),
+            "customer_satisfaction": (csat_raw, "average wait time"),
+            "staff_wellbeing": (staff_raw, "staff utilization"),
+        }
+        strengths = [f"{label} on target" for _, (raw, label) in components.items() if raw >= 0.95]
+        weaknesses = [f"{label} off target" for _, (raw, label) in components.items() if raw < 0.70]
+        weakest = min(components.values(), key=lambda c: c[0])
+        recommendation = (
+            "All targets met; keep this staffing allocation."
+            if weakest[0] >= 0.95
+            else f"Adjust staffing to improve {weakest[1]}."
+        )
+
+        return Scores(
+            profit=ScoreDetails(
+                raw_score=profit_raw, deviation=round(profit_dev, 2),
+                weighted=profit_raw,
+                details={"actual": round(labor_pct, 2), "target": targets.target_labor_cost_percent},
+            ),
+            customer_satisfaction=ScoreDetails(
+                raw_score=csat_raw, deviation=wait_dev,
+                weighted=csat_raw,
+                details={"actual": metrics.avg_wait_time_seconds, "target": targets.target_wait_time_seconds},
+            ),
+            staff_wellbeing=ScoreDetails(
+                raw_score=staff_raw, deviation=round(util_dev, 3),
+                weighted=staff_raw,
+                details={"actual": metrics.staff_utilization, "target": targets.target_staff_utilization},
+            ),
+            ranking=ranking,
+            strengths=strengths,
+            weaknesses=weaknesses,
+            recommendation=recommendation,
+            reasoning=(
+                f"Deterministic scoring: profit {profit_raw:.2f}, "
+                f"customer satisfaction {csat_raw:.2f}, staff wellbeing {staff_raw:.2f} "
+                f"(balance {overall:.2f}, {ranking})."
+            ),
+        )
+
+    @staticmethod
+    def _rank(score: float) -> str:
+        if score >= 0.95:
+            return "excellent"
+        if score >= 0.85:
+            return "very good"
+        if score >= 0.70:
+            return "good"
+        if score >= 0.50:
+            return "fair"
+        return "poor"
+
+    @retry_llm_call()
+    async def _score_options_llm(
+        self,
+        scenario: Scenario,
+        options: List[StaffingPlan],
+        simulations: List[SimulationResult],
+        alignment_targets: AlignmentTargets
+    ) -> List[Scores]:
+        """
+        Score N staffing options in a single LLM call.
 
-STAFFING OPTION:
-{option.model_dump_json(indent=2)}
+        The scenario, targets and system prompt are shared across options,
+        so packing all (option, simulation) pairs into one prompt replaces
+        N round-trips - and N prefills of the shared context - with one.
+        """
+        logger.info(f"Scoring {len(options)} option(s): {[o.id for o in options]}")
+
+        try:
+            # Shared context first, per-option blocks after
+            option_blocks = "\n".join(
+                f"""
+OPTION {i} (id={option.id}):
+STAFFING PLAN:
+{dump_json_cached(option)}
 
 SIMULATION RESULTS:
-{simulation.model_dump_json(indent=2)}
+{dump_json_cached(simulation)}
+"""
+                for i, (option, simulation) in enumerate(zip(options, simulations))
+            )
+            stable_block = f"""
+SCENARIO:
+{dump_json_cached(scenario)}
 
 ALIGNMENT TARGETS:
-{alignment_targets.model_dump_json(indent=2)}
-
-Evaluate the simulation outcomes against these targets.
+{dump_json_cached(alignment_targets)}
+"""
+            query_block = f"""{option_blocks}
+Evaluate each option's simulation outcomes against these targets.
 Calculate proximity scores (1.0 = Target Met or Exceeded).
+Return a JSON array with exactly one Scores object per option, in input order.
 """
-            
-            response = self.client.models.generate_content(
-                model=settings.gemini_model,
-                contents=[self.system_prompt, user_prompt],
-                config={
-                    "temperature": 0.4,
-                    "max_output_tokens": 8192,
-                    "response_mime_type": "application/json",
-                    "response_json_schema": Scores.model_json_schema(),
-                }
+
+            config = dict(self._base_config)
+            config["max_output_tokens"] = _MAX_OUTPUT_TOKENS_PER_OPTION * len(options)
+            if self.cache_name:
+                config["cached_content"] = self.cache_name
+                contents = [stable_block, query_block]
+            else:
+                contents = [self.system_prompt, stable_block, query_block]
+
+            text = await cached_generate(
+                self.client,
+                model=self.model,
+                contents=contents,
+                config=config
             )
-            
-            return Scores.model_validate_json(response.text)
+
+            scores = _SCORES_LIST.validate_json(text)
+            if len(scores) != len(options):
+                raise ValueError(
+                    f"Scorer returned {len(scores)} results for {len(options)} options"
+                )
+            return scores
         except Exception as e:
             logger.error(f"Scoring failed: {e}")
             # Attempt to parse partial JSON if possible, or return fallback
@@ -1,29 +1,23 @@
 """Shadow Operator Agent - Refines staffing plans based on feedback"""
 
-import json
-from google import genai
-from typing import Optional
+import asyncio
+from typing import List, Optional
+
+import orjson
+
 from src.models.schemas import (
     Scenario, Constraints, StaffingPlan, Staffing, RiskLevel
 )
 from src.config.settings import settings
 from src.utils.logger import setup_logger
-from src.utils.llm_utils import retry_llm_call
+from src.utils.genai_client import get_client
+from src.utils.llm_utils import retry_llm_call, create_prompt_cache, dump_json_cached
+from src.utils.llm_cache import cached_generate
 
 logger = setup_logger(__name__)
 
-class ShadowOperatorAgent:
-    """
-    Agent that acts as a Rational Optimizer (Shadow Operator).
-    It takes feedback from the Scorer and World Model to refine the staffing plan.
-    """
-    
-    def __init__(self):
-        self.client = genai.Client(api_key=settings.google_api_key)
-        self.system_prompt = self._build_system_prompt()
-        
-    def _build_system_prompt(self) -> str:
-        return """You are the Shadow Operator Agent, a "Rational Optimizer". 
+# Static system prompt; built once at import time
+_SYSTEM_PROMPT = """You are the Shadow Operator Agent, a "Rational Optimizer". 
 Your goal is to optimize the restaurant staffing plan to achieve perfect alignment with business objectives (Profit, Customer Satisfaction, Staff Wellbeing).
 
 ROLE: Refine the provided staffing plan based on simulation feedback and scoring results.
@@ -46,52 +40,128 @@ REASONING GUIDELINES:
 
 """
 
+# A StaffingPlan (with CoT reasoning) is ~1-2 KB; a tight budget finishes
+# decode earlier and caps cost on runaway reasoning
+_MAX_OUTPUT_TOKENS = 2048
+
+# JSON schema dict is rebuilt on every model_json_schema() call; hoist it
+_STAFFING_PLAN_SCHEMA = StaffingPlan.model_json_schema()
+
+# The only previous-plan fields the optimizer needs to reason about; IDs,
+# guest estimates and the old CoT reasoning just inflate prompt tokens
+_PREVIOUS_PLAN_FIELDS = {"strategy", "staffing", "estimated_labor_cost", "risk_level"}
+
+class ShadowOperatorAgent:
+    """
+    Agent that acts as a Rational Optimizer (Shadow Operator).
+    It takes feedback from the Scorer and World Model to refine the staffing plan.
+    """
+    
+    def __init__(self):
+        self.client = get_client()
+        self.model = settings.shadow_model or settings.gemini_model
+        self.system_prompt = _SYSTEM_PROMPT
+        self.cache_name = create_prompt_cache(
+            self.client, self.model, self.system_prompt, "shadow_operator"
+        )
+
     @retry_llm_call()
-    def generate_refined_plan(
+    async def generate_refined_plan(
         self,
         scenario: Scenario,
         constraints: Constraints,
         feedback: str,
         previous_plan: StaffingPlan,
-        context: Optional[str] = None
+        context: Optional[str] = None,
+        seed: Optional[int] = None
     ) -> StaffingPlan:
         """
         Produce a single refined plan based on feedback.
+
+        `seed` differentiates speculative parallel proposals: with the
+        shared sampling temperature, distinct seeds explore distinct
+        refinements of the same feedback.
         """
         logger.info(f"Shadow Operator refining plan for {scenario.shift.value}")
         
         try:
-            user_prompt = f"""
+            # Stable block first: identical across refinement iterations, so
+            # the provider's implicit prefix cache matches it on every call
+            stable_block = f"""
 SCENARIO:
-{scenario.model_dump_json(indent=2)}
+{dump_json_cached(scenario)}
 
 CONSTRAINTS:
-{constraints.model_dump_json(indent=2)}
+{dump_json_cached(constraints)}
 
 CONTEXT:
 {context if context else "None provided"}
-
+"""
+            previous_plan_summary = orjson.dumps(
+                previous_plan.model_dump(include=_PREVIOUS_PLAN_FIELDS)
+            ).decode()
+            query_block = f"""
 PREVIOUS PLAN:
-{previous_plan.model_dump_json(indent=2)}
+{previous_plan_summary}
 
 FEEDBACK FOR IMPROVEMENT:
 {feedback}
 
 Generate ONE refined staffing plan that addresses the feedback.
 """
-            response = self.client.models.generate_content(
-                model=settings.gemini_model,
-                contents=[self.system_prompt, user_prompt],
-                config={
-                    "temperature": settings.temperature,
-                    "max_output_tokens": 8192,
-                    "response_mime_type": "application/json",
-                    "response_json_schema": StaffingPlan.model_json_schema(),
-                }
+            config = {
+                "temperature": settings.temperature,
+                "max_output_tokens": _MAX_OUTPUT_TOKENS,
+                "response_mime_type": "application/json",
+                "response_json_schema": _STAFFING_PLAN_SCHEMA,
+            }
+            if seed is not None:
+                config["seed"] = seed
+            if self.cache_name:
+                config["cached_content"] = self.cache_name
+                contents = [stable_block, query_block]
+            else:
+                contents = [self.system_prompt, stable_block, query_block]
+
+            text = await cached_generate(
+                self.client,
+                model=self.model,
+                contents=contents,
+                config=config
             )
-            
-            return StaffingPlan.model_validate_json(response.text)
-            
+
+            return StaffingPlan.model_validate_json(text)
+
         except Exception as e:
             logger.error(f"Shadow Operator refinement failed: {e}")
             raise
+
+    async def generate_refined_plans(
+        self,
+        scenario: Scenario,
+        constraints: Constraints,
+        feedback: str,
+        previous_plan: StaffingPlan,
+        context: Optional[str] = None,
+        count: int = 2
+    ) -> List[StaffingPlan]:
+        """
+        Generate `count` speculative refinements of the same feedback,
+        concurrently.
+
+        Seed-differentiated branches explore different refinements in one
+        round-trip's wall time; the caller evaluates all and keeps the
+        best (self-consistency over proposals instead of serial retries).
+        """
+        logger.info(f"Shadow Operator generating {count} speculative proposal(s)")
+        return await asyncio.gather(*[
+            self.generate_refined_plan(
+                scenario=scenario,
+                constraints=constraints,
+                feedback=feedback,
+                previous_plan=previous_plan,
+                context=context,
+                seed=i
+            )
+            for i in range(count)
+        ])
@@ -1,26 +1,17 @@
 """World Context Agent - Analyzes environmental factors"""
 
-import json
-from google import genai
 from typing import Dict, Any
 from src.models.schemas import Scenario, DemandPrediction
 from src.config.settings import settings
 from src.utils.logger import setup_logger
+from src.utils.llm_utils import retry_llm_call, dump_json_cached
+from src.utils.llm_cache import cached_generate
+from src.utils.genai_client import get_client
 
 logger = setup_logger(__name__)
 
-class WorldContextAgent:
-    """
-    Agent that analyzes the environment (weather, time, events)
-    to provide context modifiers for demand and operations.
-    """
-    
-    def __init__(self):
-        self.client = genai.Client(api_key=settings.google_api_key)
-        self.system_prompt = self._build_system_prompt()
-        
-    def _build_system_prompt(self) -> str:
-        return """You are a World Context Analyzer. Your job is to interpret environmental variables (Shift, Weather, Events, Location) and determine their impact on QSR demand and operations.
+# Static system prompt; built once at import time
+_SYSTEM_PROMPT = """You are a World Context Analyzer. Your job is to interpret environmental variables (Shift, Weather, Events, Location) and determine their impact on QSR demand and operations.
 
 CAPABILITIES:
 - Estimate customer demand based on time, weather, events, location
@@ -38,7 +29,33 @@ LOGIC:
 
 """
 
-    def analyze_context(self, scenario: Scenario) -> DemandPrediction:
+# A DemandPrediction is a few hundred bytes; a tight budget finishes
+# decode earlier and caps cost on runaway reasoning
+_MAX_OUTPUT_TOKENS = 768
+
+# JSON schema dict is rebuilt on every model_json_schema() call; hoist it
+_DEMAND_SCHEMA = DemandPrediction.model_json_schema()
+
+class WorldContextAgent:
+    """
+    Agent that analyzes the environment (weather, time, events)
+    to provide context modifiers for demand and operations.
+    """
+    
+    def __init__(self):
+        self.client = get_client()
+        self.model = settings.context_model or settings.gemini_model
+        self.system_prompt = _SYSTEM_PROMPT
+        # Invariant per-call config, copied (not rebuilt) on each request
+        self._base_config = {
+            "temperature": 0.2, # Low temp for analytical consistency
+            "max_output_tokens": _MAX_OUTPUT_TOKENS,
+            "response_mime_type": "application/json",
+            "response_json_schema": _DEMAND_SCHEMA,
+        }
+
+    @retry_llm_call()
+    async def analyze_context(self, scenario: Scenario) -> DemandPrediction:
         """
         Analyze the scenario to produce context modifiers.
         """
@@ -47,22 +64,18 @@ LOGIC:
         try:
             user_prompt = f"""
 SCENARIO:
-{scenario.model_dump_json(indent=2)}
+{dump_json_cached(scenario)}
 
 Analyze the environmental impact on demand and operations.
 """
-            response = self.client.models.generate_content(
-                model=settings.gemini_model,
+            text = await cached_generate(
+                self.client,
+                model=self.model,
                 contents=[self.system_prompt, user_prompt],
-                config={
-                    "temperature": 0.2, # Low temp for analytical consistency
-                    "max_output_tokens": 1024,
-                    "response_mime_type": "application/json",
-                    "response_json_schema": DemandPrediction.model_json_schema(),
-                }
+                config=dict(self._base_config)
             )
-            
-            return DemandPrediction.model_validate_json(response.text)
+
+            return DemandPrediction.model_validate_json(text)
             
         except Exception as e:
             logger.error(f"Context analysis failed: {e}")
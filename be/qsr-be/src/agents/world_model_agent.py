@@ -1,27 +1,22 @@
 """World Model Simulator Agent"""
 
-import json
-from google import genai
-from typing import Dict, Optional
-from src.models.schemas import Scenario, Staffing, SimulationResult, PredictedMetrics
+import asyncio
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import AsyncIterator, Dict, List, Optional
+from src.models.schemas import Scenario, Staffing, SimulationResult, PredictedMetrics, DemandPrediction
 from src.config.settings import settings
+from src.simulation.queue_model import simulate_shift
 from src.utils.logger import setup_logger
-from src.utils.llm_utils import retry_llm_call
+from src.utils.genai_client import get_client
+from src.utils.llm_utils import retry_llm_call, create_prompt_cache, dump_json_cached
+from src.utils.llm_cache import cached_generate
 
 logger = setup_logger(__name__)
 
-class WorldModelAgent:
-    """
-    Agent that simulates QSR operations given scenario and staffing.
-    Predicts what will happen during the shift.
-    """
-    
-    def __init__(self):
-        self.client = genai.Client(api_key=settings.google_api_key)
-        self.system_prompt = self._build_system_prompt()
-        
-    def _build_system_prompt(self) -> str:
-        return """You are a QSR Operations Simulator Agent. Given environmental conditions and staffing decisions, you predict complete shift outcomes.
+# Static system prompt; built once at import time
+_SYSTEM_PROMPT = """You are a QSR Operations Simulator Agent. Given environmental conditions and staffing decisions, you predict complete shift outcomes.
 
 ROLE: Predict what will happen during a restaurant shift based on scenario factors and staffing levels.
 
@@ -64,51 +59,194 @@ CONSTRAINTS:
 Be precise with numbers and provide realistic predictions.
 IMPORTANT: Output pure, valid JSON. Keep reasoning concise (max 2 sentences)."""
 
-    @retry_llm_call()
-    def simulate(self, scenario: Scenario, staffing: Staffing, context: Optional[str] = None) -> SimulationResult:
+# JSON schema dict is rebuilt on every model_json_schema() call; hoist it
+_SIMULATION_SCHEMA = SimulationResult.model_json_schema()
+
+# The shadow loop can re-propose an identical staffing when constraints
+# bind; memoize LLM simulations for the session so a duplicate proposal
+# costs a dict lookup instead of a Gemini round-trip (module-level so it
+# survives agent instances, same pattern as the capacity cache)
+_SIM_CACHE_MAX = 256
+_sim_cache: "OrderedDict[str, SimulationResult]" = OrderedDict()
+_sim_cache_lock = threading.Lock()
+
+def _sim_cache_key(scenario: Scenario, staffing: Staffing, context: Optional[str]) -> str:
+    payload = dump_json_cached(scenario) + dump_json_cached(staffing) + (context or "")
+    return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+
+class WorldModelAgent:
+    """
+    Agent that simulates QSR operations given scenario and staffing.
+    Predicts what will happen during the shift.
+    """
+    
+    def __init__(self):
+        self.client = get_client()
+        self.model = settings.worldmodel_model or settings.gemini_model
+        self.system_prompt = _SYSTEM_PROMPT
+        self.cache_name = create_prompt_cache(
+            self.client, self.model, self.system_prompt, "world_model"
+        )
+        # Invariant per-call config, copied (not rebuilt) on each request
+        self._base_config = {
+            "temperature": settings.worldmodel_temperature,
+            "max_output_tokens": 8192,
+            "response_mime_type": "application/json",
+            "response_json_schema": _SIMULATION_SCHEMA,
+        }
+
+    async def simulate(
+        self,
+        scenario: Scenario,
+        staffing: Staffing,
+        context: Optional[str] = None,
+        demand: Optional[DemandPrediction] = None
+    ) -> SimulationResult:
         """
         Simulate a shift and predict outcomes
-        
+
         Args:
             scenario: The operational scenario
             staffing: The proposed staffing allocation
-            
+            demand: Demand prediction from the WorldContextAgent; when
+                provided (and `settings.simulation_use_llm` is off) the
+                shift is solved with the closed-form M/M/c queue model
+                instead of an LLM call
+
         Returns:
             SimulationResult with predicted metrics
         """
         logger.info(f"Simulating shift: {scenario.shift.value}, staffing: {staffing.total} total")
-        
+        if demand is not None and not settings.simulation_use_llm:
+            # The system prompt defines the simulation as arithmetic over
+            # arrival and service rates, so solve it directly
+            return simulate_shift(demand, staffing)
+
+        key = _sim_cache_key(scenario, staffing, context)
+        with _sim_cache_lock:
+            cached = _sim_cache.get(key)
+            if cached is not None:
+                _sim_cache.move_to_end(key)
+                logger.info("Simulation cache hit for duplicate staffing proposal")
+                return cached
+
+        result = await self._simulate_llm(scenario, staffing, context)
+
+        with _sim_cache_lock:
+            _sim_cache[key] = result
+            if len(_sim_cache) > _SIM_CACHE_MAX:
+                _sim_cache.popitem(last=False)
+        return result
+
+    @retry_llm_call()
+    async def _simulate_llm(self, scenario: Scenario, staffing: Staffing, context: Optional[str] = None) -> SimulationResult:
+        """LLM-backed simulation path (fallback when no demand prediction)."""
         try:
-            # Build prompt
-            user_prompt = f"""
+            # Stable block first: identical across the per-option loop, so
+            # the provider's implicit prefix cache matches it on every call
+            stable_block = f"""
 SCENARIO:
-{scenario.model_dump_json(indent=2)}
-
-STAFFING:
-{staffing.model_dump_json(indent=2)}
+{dump_json_cached(scenario)}
 
 CONTEXT:
 {context if context else "No additional context provided."}
+"""
+            query_block = f"""
+STAFFING:
+{dump_json_cached(staffing)}
 
-Simulate this {scenario.shift.value} shift and predict outcomes. 
+Simulate this {scenario.shift.value} shift and predict outcomes.
 Consider the Demand Prediction and Capacity Analysis provided in the context.
 Calculate ACTUAL customers served based on demand vs available capacity, accounting for abandonment if wait times are high.
 Provide detailed, realistic predictions in the specified JSON format.
 """
-            
+
             # Generate response
-            response = self.client.models.generate_content(
-                model=settings.gemini_model,
-                contents=[self.system_prompt, user_prompt],
-                config={
-                    "temperature": settings.temperature,
-                    "max_output_tokens": 8192,
-                    "response_mime_type": "application/json",
-                    "response_json_schema": SimulationResult.model_json_schema(),
-                }
+            config = dict(self._base_config)
+            if self.cache_name:
+                config["cached_content"] = self.cache_name
+                contents = [stable_block, query_block]
+            else:
+                contents = [self.system_prompt, stable_block, query_block]
+
+            text = await cached_generate(
+                self.client,
+                model=self.model,
+                contents=contents,
+                config=config
             )
-            
-            return SimulationResult.model_validate_json(response.text)
+
+            return SimulationResult.model_validate_json(text)
         except Exception as e:
             logger.error(f"Simulation failed: {e}")
             raise
+
+    async def simulate_stream(
+        self,
+        scenario: Scenario,
+        staffing: Staffing,
+        context: Optional[str] = None
+    ) -> AsyncIterator[str]:
+        """
+        Stream the simulation JSON as it is decoded.
+
+        SimulationResult is the largest agent payload, so streaming
+        overlaps network receive with downstream consumption and gets
+        first bytes to the UI in a fraction of the full-response time.
+        Yields raw text chunks; buffer and
+        `SimulationResult.model_validate_json("".join(chunks))` for the
+        parsed result, or use `simulate` for the blocking (and
+        disk-cacheable) path.
+        """
+        logger.info(f"Streaming simulation: {scenario.shift.value}, staffing: {staffing.total} total")
+
+        stable_block = f"""
+SCENARIO:
+{dump_json_cached(scenario)}
+
+CONTEXT:
+{context if context else "No additional context provided."}
+"""
+        query_block = f"""
+STAFFING:
+{dump_json_cached(staffing)}
+
+Simulate this {scenario.shift.value} shift and predict outcomes.
+Consider the Demand Prediction and Capacity Analysis provided in the context.
+Calculate ACTUAL customers served based on demand vs available capacity, accounting for abandonment if wait times are high.
+Provide detailed, realistic predictions in the specified JSON format.
+"""
+
+        config = dict(self._base_config)
+        if self.cache_name:
+            config["cached_content"] = self.cache_name
+            contents = [stable_block, query_block]
+        else:
+            contents = [self.system_prompt, stable_block, query_block]
+
+        async for chunk in await self.client.aio.models.generate_content_stream(
+            model=self.model,
+            contents=contents,
+            config=config
+        ):
+            if chunk.text:
+                yield chunk.text
+
+    async def simulate_many(
+        self,
+        scenario: Scenario,
+        staffings: List[Staffing],
+        context: Optional[str] = None
+    ) -> List[SimulationResult]:
+        """
+        Simulate one shift per staffing allocation, concurrently.
+
+        Each call is blocked on the network for seconds, so fanning out
+        with gather makes total latency that of the slowest call rather
+        than the sum. Results match the order of `staffings`.
+        """
+        logger.info(f"Simulating {len(staffings)} staffing option(s) concurrently")
+        return await asyncio.gather(*[
+            self.simulate(scenario=scenario, staffing=staffing, context=context)
+            for staffing in staffings
+        ])
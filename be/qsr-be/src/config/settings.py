@@ -1,5 +1,6 @@
 """Configuration settings for QSR World Model"""
 
+from functools import lru_cache
 from pydantic_settings import BaseSettings
 from typing import Optional
 import os
@@ -16,8 +17,33 @@ class Settings(BaseSettings):
     
     # Model Configuration
     gemini_model: str = "gemini-3-flash-preview"
+    # Per-agent overrides; None falls back to gemini_model. The scorer and
+    # context tasks are narrow and schema-constrained, so a small model
+    # decodes them faster at negligible quality cost.
+    scorer_model: Optional[str] = "gemini-2.5-flash-lite"
+    context_model: Optional[str] = "gemini-2.5-flash-lite"
+    worldmodel_model: Optional[str] = None
+    shadow_model: Optional[str] = None
     temperature: float = 0.25
+    # The simulator and scorer are world models: identical inputs should
+    # give identical outputs. Temperature 0 makes their LLM paths
+    # deterministic, which also lets the completion cache apply to them.
+    # Diversity-seeking agents (operator, shadow) keep `temperature`.
+    worldmodel_temperature: float = 0.0
+    scorer_temperature: float = 0.0
     max_output_tokens: int = 16384
+    # Use the LLM for capacity analysis instead of the deterministic formula
+    capacity_use_llm: bool = False
+    # Use the LLM for scoring instead of the deterministic formulas
+    scorer_use_llm: bool = False
+    # Use the LLM for shift simulation instead of the closed-form queue model
+    simulation_use_llm: bool = False
+    # Max in-flight LLM calls process-wide (bounds fan-out bursts)
+    llm_concurrency: int = 8
+    # Speculative shadow proposals evaluated in parallel per iteration
+    shadow_parallel_proposals: int = 2
+    # Max eval cases in flight at once in the eval runner
+    eval_concurrency: int = 8
     
     # API Configuration
     api_host: str = "0.0.0.0"
@@ -36,10 +62,23 @@ class Settings(BaseSettings):
         env_file = ".env"
         case_sensitive = False
 
-# Global settings instance
-settings = Settings()
+@lru_cache
+def get_settings() -> Settings:
+    """Parse settings (and .env) once per process, on first use"""
+    return Settings()
 
-# Create directories if they don't exist
-os.makedirs(settings.data_dir, exist_ok=True)
-os.makedirs(settings.results_dir, exist_ok=True)
-os.makedirs("logs", exist_ok=True)
+# Global settings instance; kept as a module attribute so the existing
+# `from src.config.settings import settings` call sites keep working
+settings = get_settings()
+
+def bootstrap() -> None:
+    """
+    Create the data/results/log directories.
+
+    Called from app startup (lifespan) rather than at import, so test
+    collection and reload-spawned workers don't touch the filesystem
+    just for importing this module.
+    """
+    os.makedirs(settings.data_dir, exist_ok=True)
+    os.makedirs(settings.results_dir, exist_ok=True)
+    os.makedirs("logs", exist_ok=True)
@@ -1,5 +1,6 @@
 """Orchestrator - Coordinates all agents in the workflow"""
 
+import asyncio
 import time
 import uuid
 from datetime import datetime
@@ -16,8 +17,9 @@ from src.models.schemas import (
     EvaluationRequest, EvaluationResponse, Constraints,
     AlignmentTargets, IterationTrace, DemandPrediction, CapacityAnalysis, Scores
 )
-import json
+from src.config.settings import settings
 from src.utils.logger import setup_logger
+from src.utils.llm_utils import dump_json_cached
 
 logger = setup_logger(__name__)
 
@@ -43,21 +45,21 @@ class QSROrchestrator:
     
     def _calculate_overall_score(self, scores: Scores) -> float:
         """Calculate overall score locally based on the average of raw component scores"""
-        components = [
-            scores.profit.raw_score,
-            scores.customer_satisfaction.raw_score,
-            scores.staff_wellbeing.raw_score
-        ]
-        return sum(components) / len(components) if components else 0.0
+        # All three components are required fields, so no empty-case guard
+        return (
+            scores.profit.raw_score
+            + scores.customer_satisfaction.raw_score
+            + scores.staff_wellbeing.raw_score
+        ) / 3
 
-    def plan_shift(self, request: PlanningRequest) -> PlanningResponse:
+    async def plan_shift(self, request: PlanningRequest) -> PlanningResponse:
         """
         Complete planning workflow with separation of human tendency and rational optimizer.
         """
         request_id = str(uuid.uuid4())
         start_time = time.time()
         
-        logger.info(f"Starting planning session {request_id}")
+        logger.info("Starting planning session %s", request_id)
         
         # Set defaults
         constraints = request.constraints or Constraints(
@@ -67,44 +69,35 @@ class QSROrchestrator:
         
         # ===== STEP 0 & 1: Context & Model Analysis (ONCE ONLY) =====
         logger.info("Phase 1: Analyzing World Context & Restaurant Model...")
-        demand_prediction = self.world_context_agent.analyze_context(request.scenario)
-        capacity_analysis = self.restaurant_agent.analyze_capacity(request.scenario.restaurant)
+        # Independent LLM calls - run them concurrently
+        demand_prediction, capacity_analysis = await asyncio.gather(
+            self.world_context_agent.analyze_context(request.scenario),
+            self.restaurant_agent.analyze_capacity(request.scenario.restaurant)
+        )
         
         shared_context = f"""
         DEMAND PREDICTION:
-        {demand_prediction.model_dump_json(indent=2)}
+        {dump_json_cached(demand_prediction)}
         
         RESTAURANT CAPACITY:
-        {capacity_analysis.model_dump_json(indent=2)}
+        {dump_json_cached(capacity_analysis)}
         """
         
         # ===== STEP 2: Restaurant Operator Initial Plan (ONCE ONLY) =====
         logger.info("Phase 2: Generating initial Restaurant Operator plan...")
-        operator_plan = self.restaurant_operator_agent.generate_initial_plan(
+        operator_plan = await self.restaurant_operator_agent.generate_initial_plan(
             scenario=request.scenario,
             constraints=constraints,
             operator_priority=request.operator_priority,
             context=shared_context
         )
-        
+
         # Simulate and score operator plan
-        operator_sim = self.world_model_agent.simulate(
-            scenario=request.scenario,
-            staffing=operator_plan.staffing,
-            context=shared_context
-        )
-        operator_scores = self.scorer_agent.score_option(
-            scenario=request.scenario,
-            option=operator_plan,
-            simulation=operator_sim,
-            alignment_targets=alignment_targets
-        )
-        
-        operator_evaluation = OptionEvaluation(
-            option=operator_plan,
-            simulation=operator_sim,
-            scores=operator_scores
+        operator_evaluation = await self._simulate_and_score(
+            request.scenario, operator_plan, shared_context, alignment_targets,
+            demand_prediction
         )
+        operator_scores = operator_evaluation.scores
         
         # ===== STEP 3: Shadow Operator Refinement Loop =====
         logger.info("Phase 3: Entering Shadow Operator optimization loop...")
@@ -119,58 +112,50 @@ class QSROrchestrator:
         
         while attempts < MAX_ATTEMPTS:
             attempts += 1
-            logger.info(f"--- Shadow Iteration {attempts}/{MAX_ATTEMPTS} ---")
+            logger.info("--- Shadow Iteration %d/%d ---", attempts, MAX_ATTEMPTS)
             
-            # Shadow Operator proposes a plan
-            shadow_plan = self.shadow_operator_agent.generate_refined_plan(
+            # Shadow Operator proposes speculative plans in parallel;
+            # seed-differentiated branches cost one round-trip of wall time
+            shadow_plans = await self.shadow_operator_agent.generate_refined_plans(
                 scenario=request.scenario,
                 constraints=constraints,
                 feedback=feedback,
                 previous_plan=current_best_evaluation.option,
-                context=shared_context
-            )
-            
-            # Simulate
-            shadow_sim = self.world_model_agent.simulate(
-                scenario=request.scenario,
-                staffing=shadow_plan.staffing,
-                context=shared_context
+                context=shared_context,
+                count=settings.shadow_parallel_proposals
             )
-            
-            # Score
-            shadow_scores = self.scorer_agent.score_option(
-                scenario=request.scenario,
-                option=shadow_plan,
-                simulation=shadow_sim,
-                alignment_targets=alignment_targets
-            )
-            
-            shadow_evaluation = OptionEvaluation(
-                option=shadow_plan,
-                simulation=shadow_sim,
-                scores=shadow_scores
+
+            # Simulate and score every proposal concurrently, keep the best
+            shadow_evaluations = await asyncio.gather(*[
+                self._simulate_and_score(
+                    request.scenario, plan, shared_context, alignment_targets,
+                    demand_prediction
+                )
+                for plan in shadow_plans
+            ])
+            # Score each proposal exactly once and keep the winner
+            shadow_overall, shadow_evaluation = max(
+                ((self._calculate_overall_score(ev.scores), ev) for ev in shadow_evaluations),
+                key=lambda pair: pair[0]
             )
-            
+
             # Capture trace
             iteration_trace = IterationTrace(
                 iteration_number=attempts,
-                evaluations=[shadow_evaluation],
+                evaluations=shadow_evaluations,
                 feedback=feedback
             )
             iterations.append(iteration_trace)
             
-            # Use local calculation for comparison
-            shadow_overall = self._calculate_overall_score(shadow_scores)
-            
             # Update best
             if shadow_overall > current_best_score:
                 current_best_evaluation = shadow_evaluation
                 current_best_score = shadow_overall
-                logger.info(f"New best score found: {shadow_overall:.3f}")
+                logger.info("New best score found: %.3f", shadow_overall)
             
             # Check exit condition
             if current_best_score >= TARGET_SCORE:
-                logger.info(f"Target score reached ({current_best_score:.3f}).")
+                logger.info("Target score reached (%.3f).", current_best_score)
                 break
             
             # Prepare feedback for next turn
@@ -189,12 +174,61 @@ class QSROrchestrator:
             iterations=iterations,
             execution_time_seconds=round(execution_time, 2)
         )
-        logger.info(f"Planning session complete in {execution_time:.2f}s")
+        logger.info("Planning session complete in %.2fs", execution_time)
         return response
 
+    async def _simulate_and_score(
+        self,
+        scenario,
+        plan,
+        shared_context: str,
+        alignment_targets: AlignmentTargets,
+        demand_prediction: Optional[DemandPrediction] = None
+    ) -> OptionEvaluation:
+        """
+        Evaluate one plan: simulate the shift, then score the outcome.
+
+        With a demand prediction the simulation is the closed-form queue
+        model and scoring is deterministic, so this costs no LLM
+        round-trips at all; without one it falls back to a single
+        simulation call per option.
+        """
+        simulation = await self.world_model_agent.simulate(
+            scenario=scenario,
+            staffing=plan.staffing,
+            context=shared_context,
+            demand=demand_prediction
+        )
+        scores = await self.scorer_agent.score_option(
+            scenario=scenario,
+            option=plan,
+            simulation=simulation,
+            alignment_targets=alignment_targets
+        )
+        return OptionEvaluation(option=plan, simulation=simulation, scores=scores)
+
     def _prepare_feedback(self, evaluation: OptionEvaluation, score: float) -> str:
-        """Helper to create feedback string for shadow operator"""
+        """
+        Helper to create feedback string for shadow operator.
+
+        Kept compact on purpose: numeric actual-vs-target deltas plus the
+        flagged issues tell the optimizer exactly what to fix in a few
+        dozen tokens, where re-dumping the full evaluation would bloat
+        every refinement prompt.
+        """
         feedback = f"Current Plan Score: {score:.3f}. "
+        deltas = []
+        for label, component in (
+            ("labor cost %", evaluation.scores.profit),
+            ("avg wait (s)", evaluation.scores.customer_satisfaction),
+            ("staff utilization", evaluation.scores.staff_wellbeing),
+        ):
+            actual = component.details.get("actual")
+            target = component.details.get("target")
+            if actual is not None and target is not None:
+                deltas.append(f"{label} {actual} vs target {target}")
+        if deltas:
+            feedback += f"Metrics: {'; '.join(deltas)}. "
         if evaluation.simulation.bottlenecks:
             feedback += f"Bottlenecks found: {', '.join(evaluation.simulation.bottlenecks)}. "
         if evaluation.scores.weaknesses:
@@ -202,15 +236,15 @@ class QSROrchestrator:
         feedback += "Address these issues to improve alignment with objectives."
         return feedback
 
-    def evaluate_shift(self, request: EvaluationRequest) -> EvaluationResponse:
+    async def evaluate_shift(self, request: EvaluationRequest) -> EvaluationResponse:
         """
         Evaluate a completed shift: compare prediction vs actual
         """
         request_id = str(uuid.uuid4())
-        logger.info(f"Starting evaluation {request_id}")
-        
+        logger.info("Starting evaluation %s", request_id)
+
         # Evaluate
-        evaluation = self.evaluator_agent.evaluate(
+        evaluation = await self.evaluator_agent.evaluate(
             prediction=request.planning_response.shadow_operator_best_plan,
             actual_data=request.actual_data
         )
@@ -234,5 +268,5 @@ class QSROrchestrator:
             prediction_quality=prediction_quality
         )
         
-        logger.info(f"Evaluation complete: {prediction_quality} prediction quality")
+        logger.info("Evaluation complete: %s prediction quality", prediction_quality)
         return response
@@ -1,9 +1,12 @@
-import json
 import asyncio
-import os
+
+import orjson
 from datetime import datetime
-from google import genai
-from typing import List, Dict
+from functools import lru_cache
+from pathlib import Path
+from typing import List, Dict, Optional, Tuple
+
+from pydantic import TypeAdapter
 from src.agents.restaurant_operator_agent import RestaurantOperatorAgent
 from src.models.schemas import Scenario, Constraints
 from src.models.eval_schemas import (
@@ -11,139 +14,301 @@ from src.models.eval_schemas import (
 )
 from src.config.settings import settings
 from src.utils.logger import setup_logger
+from src.utils.genai_client import get_client
+from src.utils.llm_utils import retry_llm_call, dump_json_cached
 
 logger = setup_logger("OperatorRunner")
 
+# One C-level pass over the whole case file beats a Python loop of
+# per-case constructors; built once at import
+_EVAL_CASES = TypeAdapter(List[OperatorEvalCase])
+
+@lru_cache
+def _get_operator_agent() -> RestaurantOperatorAgent:
+    """One agent (and its prompt cache) shared across runner instances;
+    per-model sweeps reconstruct runners but not the agent under test"""
+    return RestaurantOperatorAgent()
+
+@lru_cache
+def _ensure_dir(path: str) -> None:
+    """Create a directory once per process; repeat calls (one runner per
+    model in a sweep) are a dict hit instead of stat+mkdir syscalls"""
+    Path(path).mkdir(parents=True, exist_ok=True)
+
+# Cases judged per LLM call: bundling amortizes the fixed per-request
+# overhead (dispatch, decode spin-up, rate-limit accounting) across the
+# batch while keeping each prompt well inside the context window
+_JUDGE_BATCH_SIZE = 8
+
+_JUDGE_SCORES = TypeAdapter(List[JudgeScoring])
+
+# Invariant judge config (schema walk happens once, at import); the array
+# schema makes the model return one scoring object per case in the batch
+_JUDGE_CONFIG = {
+    "response_mime_type": "application/json",
+    "response_json_schema": {
+        "type": "array",
+        "items": JudgeScoring.model_json_schema(),
+    },
+}
+
+# Static judge preamble first, per-case blocks appended after: cases
+# sharing a scenario sort adjacent, so consecutive batch prompts share
+# the longest possible cacheable prefix
+_JUDGE_PROMPT_HEADER = """
+You are an expert QSR operations judge. Evaluate each of the following Operator Agent decisions independently.
+
+TASKS (for every case):
+1. Score Priority Alignment (0-5): How well does the plan meet that case's operator priority?
+2. Score Reasoning Quality (0-5): Is the reasoning logical, CoT-based, and considers the context (weather, events)?
+3. Provide critical feedback.
+
+Return a JSON array with exactly one scoring object per case, in the same order the cases appear below.
+"""
+
+_JUDGE_CASE_BLOCK = """
+=== CASE {index}: {case_id} ===
+SCENARIO: {scenario}
+OPERATOR PRIORITY: {priority}
+EXPECTED FOCUS: {expected_focus}
+
+AGENT'S PLAN:
+Strategy: {strategy}
+Staffing: {staffing}
+Rationale: {rationale}
+Reasoning: {reasoning}
+"""
+
 class OperatorRunner:
     def __init__(self, model_name: str = "gemini-2.0-flash-lite-preview"):
-        self.agent = RestaurantOperatorAgent()
-        self.client = genai.Client(api_key=settings.google_api_key)
+        self.agent = _get_operator_agent()
+        self.client = get_client()
         self.eval_model = model_name
         self.scenarios_path = "data/evals/operator_scenarios.json"
         self.output_dir = "data/eval_results"
-        os.makedirs(self.output_dir, exist_ok=True)
+        _ensure_dir(self.output_dir)
+        # Bounds in-flight LLM work (plan generations and judge batches),
+        # keeping the fan-out under Gemini rate limits
+        self._sem = asyncio.Semaphore(settings.eval_concurrency)
 
     def load_cases(self) -> List[OperatorEvalCase]:
-        with open(self.scenarios_path, 'r') as f:
-            data = json.load(f)
-        return [OperatorEvalCase(**case) for case in data]
+        with open(self.scenarios_path, 'rb') as f:
+            return _EVAL_CASES.validate_json(f.read())
 
-    async def evaluate_case(self, case: OperatorEvalCase) -> OperatorEvalResult:
+    async def _prepare_case(
+        self, case: OperatorEvalCase
+    ) -> Tuple[OperatorEvalCase, Optional[StaffingPlan], List[str], Optional[str]]:
+        """Phase one of a case: generate the plan and check hard constraints.
+
+        Returns (case, plan, violations, error). Judge scoring happens later
+        in batches, so a constraint failure here never spends a judge call.
+        """
         logger.info(f"Evaluating case: {case.id}")
         try:
-            # 1. Generate plan
-            plan = self.agent.generate_initial_plan(
-                scenario=case.scenario,
-                constraints=case.constraints,
-                operator_priority=case.operator_priority
-            )
-            
-            if not plan:
-                return OperatorEvalResult(
-                    case_id=case.id,
-                    passed=False,
-                    judge_feedback="Agent failed to generate any plans.",
-                    priority_score=0,
-                    reasoning_quality_score=0
+            async with self._sem:
+                plan = await self.agent.generate_initial_plan(
+                    scenario=case.scenario,
+                    constraints=case.constraints,
+                    operator_priority=case.operator_priority
                 )
-            
-            
-            # 2. Hard Constraint Validation
-            violations = []
-            if plan.staffing.total > case.constraints.available_staff:
-                violations.append(f"Total staff ({plan.staffing.total}) exceeds available ({case.constraints.available_staff})")
-            
-            for station, min_val in case.constraints.min_staff_per_station.items():
-                actual = getattr(plan.staffing, station, 0)
-                if actual < min_val:
-                    violations.append(f"{station} staffed at {actual}, minimum required is {min_val}")
-            
-            # 3. Judge LLM Scoring
-            judge_score = await self.get_judge_scoring(case, plan)
-            
-            passed = len(violations) == 0 and judge_score.priority_score >= 4 and judge_score.reasoning_score >= 3
-
-            return OperatorEvalResult(
-                case_id=case.id,
-                passed=passed,
-                plan_generated=plan,
-                constraint_violations=violations,
-                priority_score=judge_score.priority_score,
-                reasoning_quality_score=judge_score.reasoning_score,
-                judge_feedback=judge_score.feedback
-            )
-            
         except Exception as e:
             logger.error(f"Error evaluating {case.id}: {e}")
-            return OperatorEvalResult(
+            return case, None, [], str(e)
+
+        if not plan:
+            return case, None, [], None
+
+        violations = []
+        if plan.staffing.total > case.constraints.available_staff:
+            violations.append(f"Total staff ({plan.staffing.total}) exceeds available ({case.constraints.available_staff})")
+
+        # One dump, then plain dict lookups - getattr with a default
+        # goes through the descriptor slow path per station
+        staffing_by_station = plan.staffing.model_dump()
+        for station, min_val in case.constraints.min_staff_per_station.items():
+            actual = staffing_by_station.get(station, 0)
+            if actual < min_val:
+                violations.append(f"{station} staffed at {actual}, minimum required is {min_val}")
+
+        return case, plan, violations, None
+
+    @retry_llm_call()
+    async def get_judge_scoring_batch(
+        self, cases_and_plans: List[Tuple[OperatorEvalCase, StaffingPlan]]
+    ) -> List[JudgeScoring]:
+        """Judge a batch of cases with a single LLM call.
+
+        One request scoring N cases costs one dispatch and one decode
+        spin-up instead of N, and counts once against the rate limit.
+        """
+        # dump_json_cached memoizes per object, so the constant scenario
+        # JSON is serialized once no matter how many judge calls reuse it
+        blocks = [
+            _JUDGE_CASE_BLOCK.format(
+                index=i + 1,
                 case_id=case.id,
-                passed=False,
-                error=str(e),
-                judge_feedback="Internal Error during evaluation",
-                priority_score=0,
-                reasoning_quality_score=0
+                scenario=dump_json_cached(case.scenario),
+                priority=case.operator_priority,
+                expected_focus=case.expected_focus,
+                strategy=plan.strategy,
+                staffing=dump_json_cached(plan.staffing),
+                rationale=plan.rationale,
+                reasoning=plan.reasoning,
             )
+            for i, (case, plan) in enumerate(cases_and_plans)
+        ]
 
-    async def get_judge_scoring(self, case: OperatorEvalCase, plan: StaffingPlan) -> JudgeScoring:
-        prompt = f"""
-        You are an expert QSR operations judge. Evaluate the following Operator Agent decision.
-        
-        SCENARIO: {case.scenario.model_dump_json()}
-        OPERATOR PRIORITY: {case.operator_priority}
-        EXPECTED FOCUS: {case.expected_focus}
-        
-        AGENT'S PLAN:
-        Strategy: {plan.strategy}
-        Staffing: {plan.staffing.model_dump_json()}
-        Rationale: {plan.rationale}
-        Reasoning: {plan.reasoning}
-        
-        TASKS:
-        1. Score Priority Alignment (0-5): How well does the plan meet the operator's priority ({case.operator_priority})?
-        2. Score Reasoning Quality (0-5): Is the reasoning logical, CoT-based, and considers the context (weather, events)?
-        3. Provide critical feedback.
-        """
-        
-        response = self.client.models.generate_content(
+        # Async client call: the sync path would block the event loop for
+        # the whole judge latency and serialize the gathered batches
+        response = await self.client.aio.models.generate_content(
             model=self.eval_model,
-            contents=prompt,
-            config={
-                "response_mime_type": "application/json",
-                "response_json_schema": JudgeScoring.model_json_schema()
-            }
+            contents=_JUDGE_PROMPT_HEADER + "".join(blocks),
+            config=_JUDGE_CONFIG
         )
-        
-        return JudgeScoring.model_validate_json(response.text)
+
+        scores = _JUDGE_SCORES.validate_json(response.text)
+        if len(scores) != len(cases_and_plans):
+            raise ValueError(
+                f"Judge returned {len(scores)} scores for {len(cases_and_plans)} cases"
+            )
+        return scores
 
     async def run(self):
         cases = self.load_cases()
-        results = []
-        for case in cases:
-            result = await self.evaluate_case(case)
-            results.append(result)
-            
-        passed_count = sum(1 for r in results if r.passed)
+        # Dispatch cases sharing a scenario back-to-back: each judge batch
+        # starts with the invariant preamble and groups cases with identical
+        # scenario JSON, so grouped dispatch lets the provider's implicit
+        # prefix cache reuse that prefill across batches
+        cases.sort(key=lambda c: dump_json_cached(c.scenario))
+        run_stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        results_file = f"{self.output_dir}/operator_eval_{run_stamp}.jsonl"
+        summary_file = f"{self.output_dir}/operator_eval_summary_{run_stamp}.json"
+
+        # Each result is appended to the JSONL file as it settles, giving
+        # live progress on long runs and keeping peak memory at one result
+        # rather than the whole pretty-printed tree
+        with open(results_file, 'w') as jsonl:
+            def log(result: OperatorEvalResult):
+                jsonl.write(result.model_dump_json() + "\n")
+                jsonl.flush()
+
+            # Phase 1: plan generation and constraint checks are independent
+            # network-bound work, run concurrently (bounded by the semaphore)
+            prepared = await asyncio.gather(*[self._prepare_case(case) for case in cases])
+
+            results = []
+            pending = []  # constraint-clean (case, plan) pairs awaiting the judge
+            for case, plan, violations, error in prepared:
+                if error is not None:
+                    result = OperatorEvalResult(
+                        case_id=case.id,
+                        passed=False,
+                        error=error,
+                        judge_feedback="Internal Error during evaluation",
+                        priority_score=0,
+                        reasoning_quality_score=0
+                    )
+                elif plan is None:
+                    result = OperatorEvalResult(
+                        case_id=case.id,
+                        passed=False,
+                        judge_feedback="Agent failed to generate any plans.",
+                        priority_score=0,
+                        reasoning_quality_score=0
+                    )
+                elif violations:
+                    # Hard-constraint failures skip the judge entirely,
+                    # since no judge score can flip the verdict
+                    result = OperatorEvalResult(
+                        case_id=case.id,
+                        passed=False,
+                        plan_generated=plan,
+                        constraint_violations=violations,
+                        priority_score=0,
+                        reasoning_quality_score=0,
+                        judge_feedback=f"Hard constraints violated: {'; '.join(violations)}"
+                    )
+                else:
+                    pending.append((case, plan))
+                    continue
+                results.append(result)
+                log(result)
+
+            # Phase 2: judge the surviving plans in batches; a failed batch
+            # marks only its own cases, so one crash can't sink the run
+            batches = [
+                pending[i:i + _JUDGE_BATCH_SIZE]
+                for i in range(0, len(pending), _JUDGE_BATCH_SIZE)
+            ]
+
+            async def judge_and_log(batch) -> List[OperatorEvalResult]:
+                batch_results = []
+                try:
+                    async with self._sem:
+                        scores = await self.get_judge_scoring_batch(batch)
+                except Exception as e:
+                    logger.error(f"Judge batch failed: {e}")
+                    for case, plan in batch:
+                        result = OperatorEvalResult(
+                            case_id=case.id,
+                            passed=False,
+                            plan_generated=plan,
+                            error=str(e),
+                            judge_feedback="Internal Error during judging",
+                            priority_score=0,
+                            reasoning_quality_score=0
+                        )
+                        batch_results.append(result)
+                        log(result)
+                    return batch_results
+
+                for (case, plan), score in zip(batch, scores):
+                    passed = score.priority_score >= 4 and score.reasoning_score >= 3
+                    result = OperatorEvalResult(
+                        case_id=case.id,
+                        passed=passed,
+                        plan_generated=plan,
+                        priority_score=score.priority_score,
+                        reasoning_quality_score=score.reasoning_score,
+                        judge_feedback=score.feedback
+                    )
+                    batch_results.append(result)
+                    log(result)
+                return batch_results
+
+            for batch_results in await asyncio.gather(*[judge_and_log(batch) for batch in batches]):
+                results.extend(batch_results)
+
+        # Single pass over results; max() guard keeps an empty case file
+        # from dividing by zero
+        passed_count = priority_total = reasoning_total = 0
+        for r in results:
+            passed_count += r.passed
+            priority_total += r.priority_score
+            reasoning_total += r.reasoning_quality_score
+        n = max(len(cases), 1)
         summary = OperatorEvalSummary(
             timestamp=datetime.now().isoformat(),
             model_name=self.eval_model,
             total_cases=len(cases),
             passed_cases=passed_count,
-            pass_rate=passed_count / len(cases),
-            avg_priority_score=sum(r.priority_score for r in results) / len(cases),
-            avg_reasoning_score=sum(r.reasoning_quality_score for r in results) / len(cases),
-            results=results
+            pass_rate=passed_count / n,
+            avg_priority_score=priority_total / n,
+            avg_reasoning_score=reasoning_total / n
         )
-        
-        output_file = f"{self.output_dir}/operator_eval_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-        with open(output_file, 'w') as f:
-            f.write(summary.model_dump_json(indent=2))
-        
+
+        # orjson emits indented bytes directly; the dump stays
+        # human-readable for the same cost as compact stdlib output
+        with open(summary_file, 'wb') as f:
+            f.write(orjson.dumps(summary.model_dump(mode='json'), option=orjson.OPT_INDENT_2))
+
         print("\n" + "="*50)
         print(f"EVALUATION COMPLETE: {self.eval_model}")
         print(f"Pass Rate: {summary.pass_rate*100:.1f}% ({summary.passed_cases}/{summary.total_cases})")
         print(f"Avg Priority Alignment: {summary.avg_priority_score:.2f}/5")
         print(f"Avg Reasoning Quality: {summary.avg_reasoning_score:.2f}/5")
-        print(f"Results saved to: {output_file}")
+        print(f"Results saved to: {results_file}")
+        print(f"Summary saved to: {summary_file}")
         print("="*50 + "\n")
 
 if __name__ == "__main__":
@@ -33,7 +33,9 @@ class OperatorEvalSummary(BaseModel):
     pass_rate: float
     avg_priority_score: float
     avg_reasoning_score: float
-    results: List[OperatorEvalResult]
+    # Optional since per-result records are streamed to a JSONL file
+    # during the run; the summary file holds only the aggregates
+    results: List[OperatorEvalResult] = Field(default_factory=list)
 
 class JudgeScoring(BaseModel):
     """Internal model for judge scoring output"""
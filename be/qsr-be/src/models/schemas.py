@@ -1,24 +1,27 @@
 """Data models and schemas for QSR World Model"""
 
-from pydantic import BaseModel, Field, validator
+from pydantic import BaseModel, Field, computed_field, validator
 from typing import List, Dict, Optional, Literal
 from datetime import datetime, date
-from enum import Enum
+from enum import StrEnum
+from types import MappingProxyType
 
 # ===== ENUMS =====
+# StrEnum members are str natively, skipping the mixed str/Enum MRO on
+# comparison and letting pydantic coerce values with a plain dict lookup
 
-class ShiftType(str, Enum):
+class ShiftType(StrEnum):
     BREAKFAST = "breakfast"
     LUNCH = "lunch"
     DINNER = "dinner"
 
-class WeatherType(str, Enum):
+class WeatherType(StrEnum):
     SUNNY = "sunny"
     CLOUDY = "cloudy"
     RAINY = "rainy"
     STORMY = "stormy"
 
-class RiskLevel(str, Enum):
+class RiskLevel(StrEnum):
     VERY_LOW = "very_low"
     LOW = "low"
     MEDIUM = "medium"
@@ -27,6 +30,11 @@ class RiskLevel(str, Enum):
 
 # ===== INPUT MODELS =====
 
+# Hoisted so the day validator doesn't rebuild the list per instance
+_VALID_DAYS = frozenset({
+    'monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday'
+})
+
 class RestaurantConfig(BaseModel):
     """Restaurant infrastructure configuration"""
     location: str
@@ -47,19 +55,25 @@ class Scenario(BaseModel):
     
     @validator('day_of_week')
     def validate_day(cls, v):
-        valid_days = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']
-        if v.lower() not in valid_days:
-            raise ValueError(f'day_of_week must be one of {valid_days}')
-        return v.lower()
+        v = v.lower()
+        if v not in _VALID_DAYS:
+            raise ValueError(f'day_of_week must be one of {sorted(_VALID_DAYS)}')
+        return v
+
+# Default station minimums, allocated once at import; instances copy it
+# via default_factory so they keep independent, mutable dicts
+_DEFAULT_MIN_STAFF = MappingProxyType({
+    "drive_thru": 2,
+    "kitchen": 3,
+    "front_counter": 1
+})
 
 class Constraints(BaseModel):
     """Operational constraints"""
     available_staff: int = Field(ge=1)
-    min_staff_per_station: Dict[str, int] = {
-        "drive_thru": 2,
-        "kitchen": 3,
-        "front_counter": 1
-    }
+    min_staff_per_station: Dict[str, int] = Field(
+        default_factory=lambda: dict(_DEFAULT_MIN_STAFF)
+    )
 
 class AlignmentTargets(BaseModel):
     """Operational targets for the shift"""
@@ -74,11 +88,13 @@ class Staffing(BaseModel):
     drive_thru: int = Field(ge=0)
     kitchen: int = Field(ge=0)
     front_counter: int = Field(ge=0)
-    total: int = 0
-    
-    @validator('total', always=True)
-    def calculate_total(cls, v, values):
-        return values.get('drive_thru', 0) + values.get('kitchen', 0) + values.get('front_counter', 0)
+
+    # Derived, not stored: a v1-style always-validator re-summed (and could
+    # drift from) the station fields on every validation pass
+    @computed_field
+    @property
+    def total(self) -> int:
+        return self.drive_thru + self.kitchen + self.front_counter
 
 class StaffingPlan(BaseModel):
     """A staffing plan option produced by an operator agent"""
@@ -0,0 +1,161 @@
+"""Closed-form M/M/c queueing model for shift simulation"""
+
+from typing import List, Sequence, Tuple
+
+from src.models.schemas import (
+    DemandPrediction, Staffing, PredictedMetrics, SimulationResult
+)
+
+# numba is optional: when present the Erlang-C kernel is JIT-compiled,
+# which matters for large (scenario x staffing) sweeps; without it the
+# pure-Python loop is still microseconds per call
+try:
+    from numba import njit
+    _NUMBA_AVAILABLE = True
+except ImportError:
+    _NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        def passthrough(func):
+            return func
+        return passthrough
+
+# Operating constants (mirror the spec in the world-model system prompt)
+SERVICE_RATE_PER_STAFF = 35.0   # orders/hr per staff member (kitchen-paced)
+AVG_ORDER_VALUE = 18.0          # blended drive-thru ($16) / walk-in ($20)
+LABOR_RATE_PER_HOUR = 25.0      # $/hr per staff member
+FOOD_COST_PCT = 0.20
+SHIFT_HOURS = 8
+ABANDON_WAIT_SECONDS = 600      # customers walk after a 10-minute wait
+
+@njit(cache=True, fastmath=True)
+def erlang_c(servers: int, offered_load: float) -> float:
+    """
+    Probability an arriving customer must queue (Erlang-C).
+
+    `offered_load` is lambda/mu in erlangs. Computed iteratively in
+    ordinary floats - no factorials - so it is stable for any realistic
+    staff count. Returns 1.0 when the system is saturated.
+    """
+    if servers <= 0 or offered_load >= servers:
+        return 1.0
+    # Erlang-B by recurrence, then convert to Erlang-C
+    b = 1.0
+    for k in range(1, servers + 1):
+        b = offered_load * b / (k + offered_load * b)
+    rho = offered_load / servers
+    return b / (1 - rho * (1 - b))
+
+if _NUMBA_AVAILABLE:
+    # Compile at import (cache=True persists it) so the first real call
+    # is not hit by JIT latency
+    erlang_c(2, 0.5)
+
+def simulate_shift(
+    demand: DemandPrediction,
+    staffing: Staffing,
+    shift_hours: int = SHIFT_HOURS
+) -> SimulationResult:
+    """
+    Predict shift outcomes from the M/M/c queue in closed form.
+
+    The world-model prompt specifies this as arithmetic (arrival rates,
+    per-staff service rates, Little's law, fixed $/hr costs), so it is
+    solved directly: microseconds instead of an LLM round-trip, exact and
+    reproducible. The peak hourly rate from the WorldContextAgent
+    prediction sizes the queueing metrics (the worst wait a plan must
+    survive), while customers served - and revenue - are capped by the
+    predicted total for the shift, since the peak rate is not sustained
+    for all of it.
+    """
+    demand_per_hr = float(demand.peak_demand_per_hour)
+    servers = max(staffing.total, 1)
+    service_rate = SERVICE_RATE_PER_STAFF
+    capacity_per_hr = servers * service_rate
+    offered_load = demand_per_hr / service_rate
+    utilization = min(demand_per_hr / capacity_per_hr, 1.0)
+
+    if demand_per_hr < capacity_per_hr:
+        p_wait = erlang_c(servers, offered_load)
+        # Mean queueing delay, hours -> seconds
+        wait_seconds = p_wait / (capacity_per_hr - demand_per_hr) * 3600
+        served_per_hr = demand_per_hr
+    else:
+        # Saturated: the queue grows for the whole shift; wait is capped at
+        # the abandonment threshold and the overflow walks away
+        wait_seconds = float(ABANDON_WAIT_SECONDS)
+        served_per_hr = capacity_per_hr
+
+    abandoned = wait_seconds >= ABANDON_WAIT_SECONDS
+    # served_per_hr holds only at peak; the shift serves no more than the
+    # predicted total arrivals (or capacity, whichever binds first)
+    customers_served = min(
+        demand.estimated_total_demand, int(served_per_hr * shift_hours)
+    )
+    queue_length = demand_per_hr * (wait_seconds / 3600)  # Little's law
+
+    revenue = customers_served * AVG_ORDER_VALUE
+    labor_cost = staffing.total * LABOR_RATE_PER_HOUR * shift_hours
+    food_cost = revenue * FOOD_COST_PCT
+    # Accuracy degrades once staff run past the utilization sweet spot
+    order_accuracy = max(0.85, 0.97 - max(0.0, utilization - 0.90))
+
+    key_events, bottlenecks = _describe(utilization, wait_seconds, abandoned)
+
+    return SimulationResult(
+        predicted_metrics=PredictedMetrics(
+            customers_served=customers_served,
+            revenue=round(revenue, 2),
+            avg_wait_time_seconds=int(wait_seconds),
+            peak_wait_time_seconds=int(wait_seconds * 1.5),
+            max_queue_length=int(queue_length) + 1,
+            labor_cost=round(labor_cost, 2),
+            food_cost=round(food_cost, 2),
+            staff_utilization=round(utilization, 3),
+            order_accuracy=round(order_accuracy, 3),
+        ),
+        key_events=key_events,
+        bottlenecks=bottlenecks,
+        confidence=0.9,
+        reasoning=(
+            f"M/M/c queue: peak demand {demand_per_hr:.0f}/hr against "
+            f"{servers} staff x {service_rate:.0f} orders/hr "
+            f"(utilization {utilization:.2f}, mean wait {wait_seconds:.0f}s); "
+            f"served capped at {customers_served} of "
+            f"{demand.estimated_total_demand} predicted arrivals."
+        ),
+    )
+
+def simulate_sweep(
+    demands: Sequence[DemandPrediction],
+    staffings: Sequence[Staffing],
+    shift_hours: int = SHIFT_HOURS
+) -> List[SimulationResult]:
+    """
+    Simulate every (demand, staffing) candidate pair.
+
+    The per-candidate cost is dominated by the Erlang-C kernel, which is
+    JIT-compiled when numba is installed, so sweeps over thousands of
+    candidates stay in the millisecond range. Results match input order.
+    """
+    return [
+        simulate_shift(demand, staffing, shift_hours)
+        for demand, staffing in zip(demands, staffings)
+    ]
+
+def _describe(
+    utilization: float, wait_seconds: float, abandoned: bool
+) -> Tuple[List[str], List[str]]:
+    """Deterministic narrative for the simulated shift."""
+    key_events: List[str] = []
+    bottlenecks: List[str] = []
+    if abandoned:
+        key_events.append("Demand exceeded capacity; customers abandoned after 10-minute waits")
+        bottlenecks.append("Service capacity below demand")
+    elif wait_seconds > 180:
+        key_events.append("Queues formed during peak demand")
+    if utilization > 0.90:
+        bottlenecks.append("Staff utilization above the 0.90 sweet spot")
+    elif utilization < 0.75:
+        key_events.append("Staff idle below the 0.75 utilization sweet spot")
+    return key_events, bottlenecks
@@ -0,0 +1,34 @@
+"""Shared Gemini client factory"""
+
+from functools import lru_cache
+import httpx
+from google import genai
+from google.genai import types
+from src.config.settings import settings
+
+@lru_cache(maxsize=1)
+def get_client() -> genai.Client:
+    """Return the process-wide Gemini client, constructed on first use.
+
+    The client holds an HTTP connection pool and auth state, so sharing one
+    instance across agents reuses keep-alive connections instead of paying a
+    fresh TLS handshake per agent. The pool is sized to the fan-out ceiling
+    (llm_concurrency plus the eval runner's window) so gathered calls never
+    queue on connection acquisition, with keep-alive matching so warm
+    connections aren't torn down between bursts.
+    """
+    pool_size = settings.llm_concurrency + settings.eval_concurrency
+    limits = {
+        "limits": httpx.Limits(
+            max_connections=pool_size,
+            max_keepalive_connections=pool_size,
+        )
+    }
+    return genai.Client(
+        api_key=settings.google_api_key,
+        http_options=types.HttpOptions(
+            timeout=60_000,
+            client_args=limits,
+            async_client_args=limits,
+        ),
+    )
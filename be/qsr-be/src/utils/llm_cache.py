@@ -0,0 +1,103 @@
+"""Disk-backed LLM completion cache"""
+
+import hashlib
+import os
+from pathlib import Path
+
+import orjson
+
+from google.genai import errors as genai_errors
+
+from src.utils.llm_utils import prompt_cache_digests, prompt_cache_prompts
+from src.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Survives process restarts, so repeated dev runs and test reruns with
+# identical prompts skip the network entirely
+_CACHE_DIR = Path(os.environ.get("QSR_LLM_CACHE_DIR", "/tmp/qsr-llm-cache"))
+
+def _cache_enabled() -> bool:
+    # QSR_LLM_CACHE=off disables lookups (e.g. for benchmarking real latency)
+    return os.environ.get("QSR_LLM_CACHE", "on").lower() not in ("off", "0", "false")
+
+# Cache names whose hour-long TTL has lapsed server-side; calls rewrite
+# themselves to the inline system prompt instead of failing against a
+# dead cache on every request until the process restarts
+_expired_caches: set = set()
+
+def _inline_fallback(contents: list, config: dict) -> tuple:
+    """Rewrite a cached_content call to send its system prompt inline."""
+    name = config.get("cached_content")
+    config = {k: v for k, v in config.items() if k != "cached_content"}
+    prompt = prompt_cache_prompts.get(name)
+    if prompt is not None:
+        contents = [prompt, *contents]
+    return contents, config
+
+def _cache_key(model: str, contents: list, config: dict) -> str:
+    cached_content = config.get("cached_content")
+    if cached_content is not None:
+        # The cachedContents/... name is minted fresh every process;
+        # substitute the stable digest of the prompt behind it so keys
+        # (and therefore hits) survive restarts
+        config = {
+            **config,
+            "cached_content": prompt_cache_digests.get(cached_content, cached_content),
+        }
+    payload = orjson.dumps(
+        {"model": model, "contents": contents, "config": config},
+        option=orjson.OPT_SORT_KEYS,
+    )
+    return hashlib.blake2b(payload, digest_size=16).hexdigest()
+
+async def cached_generate(client, model: str, contents: list, config: dict) -> str:
+    """
+    Generate content, consulting the disk cache for deterministic calls.
+
+    The cache key covers model, contents and the full generation config
+    (with any cached_content name normalized to its stable prompt digest),
+    so any real input change misses.
+    Only temperature-0 calls are cached - sampled output is not
+    reproducible, so caching it would silently change behavior. Returns
+    the response text.
+    """
+    if config.get("cached_content") in _expired_caches:
+        contents, config = _inline_fallback(contents, config)
+
+    cacheable = _cache_enabled() and config.get("temperature") == 0
+    if cacheable:
+        path = _CACHE_DIR / f"{_cache_key(model, contents, config)}.json"
+        try:
+            text = path.read_text()
+            logger.info(f"LLM cache hit: {path.name}")
+            return text
+        except OSError:
+            pass
+
+    try:
+        response = await client.aio.models.generate_content(
+            model=model, contents=contents, config=config
+        )
+    except genai_errors.APIError as e:
+        # A lapsed CachedContent surfaces as a non-retryable 4xx; retry
+        # once with the inline prompt rather than 500ing every request
+        # for the rest of the process lifetime
+        name = config.get("cached_content")
+        if name is None or e.code not in (400, 403, 404):
+            raise
+        logger.warning(
+            f"Prompt cache {name} rejected ({e.code}); falling back to inline prompt"
+        )
+        _expired_caches.add(name)
+        contents, config = _inline_fallback(contents, config)
+        if cacheable:
+            path = _CACHE_DIR / f"{_cache_key(model, contents, config)}.json"
+        response = await client.aio.models.generate_content(
+            model=model, contents=contents, config=config
+        )
+
+    if cacheable and response.text:
+        _CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        path.write_text(response.text)
+    return response.text
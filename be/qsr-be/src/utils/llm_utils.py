@@ -1,7 +1,17 @@
 
+import asyncio
+import hashlib
+import inspect
+import random
 import time
 import functools
+import weakref
+from typing import Optional
+
+import orjson
 from google.api_core.exceptions import ResourceExhausted, ServiceUnavailable, InternalServerError
+from google.genai import errors as genai_errors
+from src.config.settings import settings
 from src.utils.logger import setup_logger
 
 
@@ -19,37 +29,212 @@ class LLMServiceError(LLMGenerationError):
     """Raised when the LLM service is unavailable"""
     pass
 
+# Serialized form keyed by (object id, indent); entries are evicted when the
+# source object is garbage collected
+_dump_cache: dict = {}
+
+def dump_json_cached(model, indent: Optional[int] = None) -> str:
+    """
+    Serialize a Pydantic model for prompt embedding, memoized per instance.
+
+    The same scenario/constraints objects flow through several agents (and
+    through every retry attempt), so the pydantic-core serialization walk
+    only needs to happen once per object. Defaults to compact JSON: the
+    model parses it just as well and pretty-printing roughly doubles the
+    prompt's character (and token) count.
+    """
+    key = (id(model), indent)
+    cached = _dump_cache.get(key)
+    if cached is None:
+        cached = model.model_dump_json(indent=indent)
+        _dump_cache[key] = cached
+        weakref.finalize(model, _dump_cache.pop, key, None)
+    return cached
+
+def parse_model_fast(model_cls, text: str):
+    """
+    Parse schema-guided LLM output into `model_cls` without re-validation.
+
+    When a response was produced under `response_json_schema`, the shape is
+    already enforced server-side, so the pydantic-core validation walk is
+    redundant; `model_construct` over an orjson parse skips it. The fast
+    path is taken only when every required field is present - invalid JSON,
+    a non-object payload or a missing required key falls back to the full
+    validating parse (model_construct itself would raise on none of those,
+    yielding half-built models that explode far from the parse site). Field
+    types are taken on faith from the schema-guided decode. Only safe for
+    flat models - `model_construct` does not recurse into nested BaseModel
+    fields.
+    """
+    try:
+        data = orjson.loads(text)
+        if all(
+            name in data or not field.is_required()
+            for name, field in model_cls.model_fields.items()
+        ):
+            return model_cls.model_construct(**data)
+    except Exception:
+        pass
+    return model_cls.model_validate_json(text)
+
+# Maps a minted cachedContents/... name to the stable digest of the prompt
+# behind it. The names are fresh every process, so the disk completion
+# cache keys on the digest instead to keep hitting across restarts.
+prompt_cache_digests: dict = {}
+
+# And to the prompt text itself: the caches carry a 1-hour TTL while the
+# API process holds each name for its whole lifetime, so expired-cache
+# calls fall back to re-sending this prompt inline
+prompt_cache_prompts: dict = {}
+
+def create_prompt_cache(client, model: str, system_instruction: str, display_name: str) -> Optional[str]:
+    """
+    Create a Gemini cached-content entry for a static system prompt.
+
+    Cached input tokens are billed at a fraction of normal and skip
+    re-encoding on every call. Returns the cache name to pass as
+    `cached_content`, or None when caching is unavailable (e.g. the prompt
+    is below the service's minimum token count) so callers fall back to
+    sending the prompt inline.
+    """
+    # Hash the prompt into the display name so edits invalidate old caches
+    digest = hashlib.blake2b(system_instruction.encode(), digest_size=4).hexdigest()
+    try:
+        cache = client.caches.create(
+            model=model,
+            config={
+                "system_instruction": system_instruction,
+                "ttl": "3600s",
+                "display_name": f"{display_name}_{digest}",
+            },
+        )
+        logger.info(f"Created prompt cache {cache.name} for {display_name}")
+        prompt_cache_digests[cache.name] = digest
+        prompt_cache_prompts[cache.name] = system_instruction
+        return cache.name
+    except Exception as e:
+        logger.warning(f"Prompt cache unavailable for {display_name} ({e}); falling back to inline prompt")
+        return None
+
+# One semaphore per event loop bounds in-flight LLM calls, so concurrent
+# fan-outs (option sweeps, parallel iterations) cannot stampede the API.
+# Keyed by loop rather than held in a single global: a Semaphore binds to
+# the first loop that blocks on it, and a process that runs several loops
+# back-to-back (per-model eval sweeps, CLI then tests) would otherwise
+# crash with "bound to a different event loop" on the second asyncio.run.
+_llm_semaphores: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+def _get_llm_semaphore() -> asyncio.Semaphore:
+    loop = asyncio.get_running_loop()
+    sem = _llm_semaphores.get(loop)
+    if sem is None:
+        sem = asyncio.Semaphore(settings.llm_concurrency)
+        _llm_semaphores[loop] = sem
+    return sem
+
+def _retry_category(e: Exception) -> Optional[str]:
+    """
+    Classify an exception as 'quota' (429), 'service' (5xx) or None
+    (not retryable). Type/status checks instead of scanning str(e), so a
+    prompt or payload that happens to contain "429" cannot trigger a
+    spurious retry.
+    """
+    if isinstance(e, ResourceExhausted):
+        return "quota"
+    if isinstance(e, (ServiceUnavailable, InternalServerError)):
+        return "service"
+    if isinstance(e, genai_errors.APIError):
+        if e.code == 429:
+            return "quota"
+        if e.code in (500, 503):
+            return "service"
+    return None
+
+def _retry_after_seconds(e: Exception) -> float:
+    """
+    Server-provided retry hint in seconds, or 0 when absent.
+
+    gRPC ResourceExhausted carries retry_delay; REST errors may carry a
+    Retry-After header. Honoring it avoids both re-colliding too early
+    and over-sleeping past the quota window.
+    """
+    retry_delay = getattr(e, "retry_delay", None)
+    if retry_delay is not None:
+        return float(getattr(retry_delay, "seconds", 0) or 0)
+    headers = getattr(getattr(e, "response", None), "headers", None)
+    if headers:
+        try:
+            return float(headers.get("retry-after") or 0)
+        except (TypeError, ValueError):
+            pass
+    return 0.0
+
+def _jittered(delay: float) -> float:
+    # Full jitter in [delay/2, delay]: parallel calls that hit a 429
+    # together spread their retries instead of re-colliding
+    return delay * (0.5 + random.random() / 2)
+
 def retry_llm_call(max_retries=2, initial_delay=2.0, backoff_factor=2.0):
     """
     Decorator to retry LLM calls on 429 Resource Exhausted or 503 Service Unavailable.
-    Uses exponential backoff.
+    Uses exponential backoff with jitter. Works on both sync and async methods;
+    the wrapper is built once at decoration time, and async calls share a
+    process-wide concurrency semaphore.
     """
     def decorator(func):
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                delay = initial_delay
+                # max_retries means retries: 1 initial attempt + max_retries more
+                for attempt in range(max_retries + 1):
+                    try:
+                        async with _get_llm_semaphore():
+                            return await func(*args, **kwargs)
+                    except Exception as e:
+                        category = _retry_category(e)
+                        if category is None:
+                            raise
+                        if attempt == max_retries:
+                            # Out of retries: raise now instead of sleeping first
+                            logger.error(f"Failed after {max_retries} retries.")
+                            if category == "quota":
+                                raise LLMQuotaError(f"High traffic volume (Quota Exceeded). Please try again in a few moments.")
+                            raise LLMServiceError(f"Service temporarily unavailable after {max_retries} retries.")
+                        label = "Rate limit (429)" if category == "quota" else "Service unavailable (5xx)"
+                        logger.warning(f"{label} hit on attempt {attempt+1}/{max_retries+1}. Retrying in {delay:.1f}s...")
+                        # Jittered backoff, floored at the server's hint
+                        await asyncio.sleep(max(_jittered(delay), _retry_after_seconds(e)))
+                        delay *= backoff_factor
+                        # Cap delay at 60s
+                        delay = min(delay, 60.0)
+
+            return async_wrapper
+
         @functools.wraps(func)
         def wrapper(*args, **kwargs):
             delay = initial_delay
-            for attempt in range(max_retries):
+            # max_retries means retries: 1 initial attempt + max_retries more
+            for attempt in range(max_retries + 1):
                 try:
                     return func(*args, **kwargs)
                 except Exception as e:
-                    error_str = str(e).lower()
-                    if "429" in error_str or "resource exhausted" in error_str or "quota" in error_str or "too many requests" in error_str:
-                        logger.warning(f"Rate limit (429) hit on attempt {attempt+1}/{max_retries}. Retrying in {delay:.1f}s...")
-                        time.sleep(delay)
-                        delay *= backoff_factor
-                        # Cap delay at 60s
-                        delay = min(delay, 60.0)
-                    elif "503" in error_str or "service unavailable" in error_str:
-                        logger.warning(f"Service unavailable (503) on attempt {attempt+1}/{max_retries}. Retrying in {delay:.1f}s...")
-                        time.sleep(delay)
-                        delay *= backoff_factor
-                    else:
-                        raise e
-            
-            logger.error(f"Failed after {max_retries} retries.")
-            if "429" in error_str or "resource exhausted" in error_str:
-                raise LLMQuotaError(f"High traffic volume (Quota Exceeded). Please try again in a few moments.")
-            raise LLMServiceError(f"Service temporarily unavailable after {max_retries} retries.")
+                    category = _retry_category(e)
+                    if category is None:
+                        raise
+                    if attempt == max_retries:
+                        # Out of retries: raise now instead of sleeping first
+                        logger.error(f"Failed after {max_retries} retries.")
+                        if category == "quota":
+                            raise LLMQuotaError(f"High traffic volume (Quota Exceeded). Please try again in a few moments.")
+                        raise LLMServiceError(f"Service temporarily unavailable after {max_retries} retries.")
+                    label = "Rate limit (429)" if category == "quota" else "Service unavailable (5xx)"
+                    logger.warning(f"{label} hit on attempt {attempt+1}/{max_retries+1}. Retrying in {delay:.1f}s...")
+                    # Jittered backoff, floored at the server's hint
+                    time.sleep(max(_jittered(delay), _retry_after_seconds(e)))
+                    delay *= backoff_factor
+                    # Cap delay at 60s
+                    delay = min(delay, 60.0)
 
         return wrapper
     return decorator
@@ -1,37 +1,57 @@
 import logging
 import sys
+from functools import lru_cache
 from pathlib import Path
+from typing import Optional
 from src.config.settings import settings
 
+# Formatter is immutable and shared by every handler
+_FORMATTER = logging.Formatter(
+    '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    datefmt='%Y-%m-%d %H:%M:%S'
+)
+
+# Names already configured this process; cheaper than re-resolving
+# settings and inspecting handler lists on every import-time call
+_CONFIGURED: set = set()
+
+@lru_cache
+def _log_file() -> Optional[Path]:
+    """Resolve the log file path and create its directory, once per process"""
+    if not settings.log_file:
+        return None
+    log_file = Path(settings.log_file)
+    log_file.parent.mkdir(parents=True, exist_ok=True)
+    return log_file
+
 def setup_logger(name: str) -> logging.Logger:
     """Sets up a logger with console and file handlers."""
-    
+
+    if name in _CONFIGURED:
+        return logging.getLogger(name)
+
     logger = logging.getLogger(name)
-    
+
     # If logger already has handlers, don't add them again
     if logger.handlers:
+        _CONFIGURED.add(name)
         return logger
-        
+
     level = getattr(logging, settings.log_level.upper(), logging.INFO)
     logger.setLevel(level)
-    
-    # Formatter
-    formatter = logging.Formatter(
-        '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        datefmt='%Y-%m-%d %H:%M:%S'
-    )
-    
+
     # Console Handler
     console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setFormatter(formatter)
+    console_handler.setFormatter(_FORMATTER)
     logger.addHandler(console_handler)
-    
-    # File Handler
-    if settings.log_file:
-        log_file = Path(settings.log_file)
-        log_file.parent.mkdir(parents=True, exist_ok=True)
-        file_handler = logging.FileHandler(log_file)
-        file_handler.setFormatter(formatter)
+
+    # File Handler; delay=True defers the open() until the first record
+    # is actually written, so importing a module never touches the file
+    log_file = _log_file()
+    if log_file:
+        file_handler = logging.FileHandler(log_file, delay=True)
+        file_handler.setFormatter(_FORMATTER)
         logger.addHandler(file_handler)
-        
+
+    _CONFIGURED.add(name)
     return logger
@@ -0,0 +1,73 @@
+"""Semantic similarity cache for LLM responses"""
+
+import threading
+from typing import Any, List, Optional
+
+from src.utils.logger import setup_logger
+
+# Optional dependency: the cache is inert (always misses) without it
+try:
+    import numpy as np
+    from sentence_transformers import SentenceTransformer
+    _EMBEDDINGS_AVAILABLE = True
+except ImportError:
+    _EMBEDDINGS_AVAILABLE = False
+
+logger = setup_logger(__name__)
+
+_EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+_SIMILARITY_THRESHOLD = 0.97
+_MAX_ENTRIES = 10_000
+
+class SemanticCache:
+    """
+    In-process response cache keyed by embedding similarity of the prompt.
+
+    Prompts to a given agent share the same template and differ only in
+    numeric details, so many calls are identical in spirit. Prompts are
+    embedded with a small on-device model, L2-normalized, and matched by
+    dot product against stored entries; anything above the similarity
+    threshold short-circuits the LLM call. Requires `sentence-transformers`
+    (optional); without it every lookup is a miss.
+    """
+
+    def __init__(self, threshold: float = _SIMILARITY_THRESHOLD):
+        self.threshold = threshold
+        self._lock = threading.Lock()
+        self._model = None
+        self._embeddings = None  # (n, dim) matrix of normalized embeddings
+        self._responses: List[Any] = []
+
+    def _embed(self, text: str):
+        if self._model is None:
+            self._model = SentenceTransformer(_EMBEDDING_MODEL)
+        return self._model.encode([text], normalize_embeddings=True)[0]
+
+    def get(self, prompt: str) -> Optional[Any]:
+        """Return the cached response most similar to `prompt`, or None."""
+        if not _EMBEDDINGS_AVAILABLE:
+            return None
+        with self._lock:
+            if not self._responses:
+                return None
+            query = self._embed(prompt)
+            similarities = self._embeddings @ query
+            best = int(similarities.argmax())
+            if similarities[best] >= self.threshold:
+                logger.info(f"Semantic cache hit (similarity {similarities[best]:.3f})")
+                return self._responses[best]
+        return None
+
+    def put(self, prompt: str, response: Any) -> None:
+        """Store a response under the prompt's embedding."""
+        if not _EMBEDDINGS_AVAILABLE:
+            return
+        with self._lock:
+            if len(self._responses) >= _MAX_ENTRIES:
+                return
+            embedding = self._embed(prompt)
+            if self._embeddings is None:
+                self._embeddings = embedding[np.newaxis, :]
+            else:
+                self._embeddings = np.vstack([self._embeddings, embedding])
+            self._responses.append(response)
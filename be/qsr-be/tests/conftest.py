@@ -0,0 +1,140 @@
+"""Shared fixtures for QSR World Model tests"""
+
+import os
+
+# Settings requires google_api_key, and importing any agent module pulls
+# settings in at collection time - default a dummy key first so the
+# mocked suite collects and runs with no credentials configured
+os.environ.setdefault("GOOGLE_API_KEY", "test-key")
+
+import pytest
+from datetime import date
+from src.models.schemas import (
+    Scenario, RestaurantConfig, Staffing, Constraints, AlignmentTargets,
+    StaffingPlan, SimulationResult, PredictedMetrics,
+    ShiftType, WeatherType, RiskLevel
+)
+
+# Canned LLM responses: valid JSON for the schemas the agents parse, built
+# once at import from the same models so schema changes break loudly here
+_CANNED_SIMULATION = SimulationResult(
+    predicted_metrics=PredictedMetrics(
+        customers_served=280,
+        revenue=5040.0,
+        avg_wait_time_seconds=210,
+        peak_wait_time_seconds=360,
+        max_queue_length=6,
+        labor_cost=2000.0,
+        food_cost=1008.0,
+        staff_utilization=0.8,
+        order_accuracy=0.95
+    ),
+    key_events=["17:00 dinner peak begins"],
+    bottlenecks=["drive_thru near capacity at peak"],
+    confidence=0.9,
+    reasoning="Deterministic stub response"
+).model_dump_json()
+
+_CANNED_PLAN = StaffingPlan(
+    id="mock_plan",
+    strategy="Balanced Dinner",
+    estimated_total_guest=280,
+    estimated_peak_guest=60,
+    staffing=Staffing(drive_thru=3, kitchen=5, front_counter=2),
+    estimated_labor_cost=2000.0,
+    risk_level=RiskLevel.LOW,
+    rationale="Canned plan for offline tests",
+    reasoning="Deterministic stub response"
+).model_dump_json()
+
+@pytest.fixture(scope="session", autouse=True)
+def mock_llm():
+    """Swap the agents' LLM backends for canned responses.
+
+    Test wall-clock was dominated by model inference and TLS setup, not the
+    code under test; with the stubs the integration tests run CPU-local and
+    offline. Session-scoped (a marker gate cannot reach the session-scoped
+    sample_simulation fixture), so live runs opt in with QSR_LIVE_LLM=1.
+    """
+    if os.environ.get("QSR_LIVE_LLM"):
+        yield
+        return
+
+    async def fake_simulation(client, model=None, contents=None, config=None):
+        return _CANNED_SIMULATION
+
+    async def fake_plan(client, model=None, contents=None, config=None):
+        return _CANNED_PLAN
+
+    mp = pytest.MonkeyPatch()
+    # Every non-streaming agent call funnels through its module's
+    # cached_generate; patching that name per module stubs the network
+    # without touching the prompt building or parsing under test
+    for module, stub in (
+        ("src.agents.world_model_agent", fake_simulation),
+        ("src.agents.restaurant_operator_agent", fake_plan),
+        ("src.agents.shadow_operator_agent", fake_plan),
+    ):
+        mp.setattr(f"{module}.cached_generate", stub)
+    # create_prompt_cache is stubbed for every agent that calls it in
+    # __init__ (the scorer and evaluator too, even though their generate
+    # paths aren't exercised here) so constructing any agent stays offline
+    for module in (
+        "src.agents.world_model_agent",
+        "src.agents.restaurant_operator_agent",
+        "src.agents.shadow_operator_agent",
+        "src.agents.scorer_agent",
+        "src.agents.evaluator_agent",
+    ):
+        mp.setattr(f"{module}.create_prompt_cache", lambda *a, **k: None)
+    yield
+    mp.undo()
+
+# Session-scoped: the tests only read these objects, so one instance
+# serves the whole run instead of re-validating per test. The inputs are
+# known-valid literals, so model_construct skips the validation walk too;
+# the validation tests still exercise the real constructors. Plain
+# pydantic models pickle cleanly, so the fixtures also work under
+# pytest-xdist workers.
+@pytest.fixture(scope="session")
+def sample_scenario():
+    """Sample scenario for testing"""
+    return Scenario.model_construct(
+        shift=ShiftType.DINNER,
+        # Pinned (a Friday) so the session-cached instance is deterministic
+        date=date(2024, 1, 5),
+        day_of_week="friday",
+        weather=WeatherType.RAINY,
+        special_events=["friday_rush"],
+        restaurant=RestaurantConfig.model_construct(
+            location="Downtown Atlanta",
+            has_drive_thru=True,
+            drive_thru_lanes=2,
+            kitchen_capacity="medium"
+        )
+    )
+
+@pytest.fixture(scope="session")
+def sample_staffing():
+    """Sample staffing allocation"""
+    return Staffing.model_construct(
+        drive_thru=3,
+        kitchen=5,
+        front_counter=2
+    )
+
+@pytest.fixture(scope="session")
+def sample_constraints():
+    """Sample operational constraints"""
+    return Constraints.model_construct(
+        available_staff=15
+    )
+
+@pytest.fixture(scope="session")
+def sample_alignment():
+    """Sample alignment targets"""
+    return AlignmentTargets.model_construct(
+        target_labor_cost_percent=30.0,
+        target_wait_time_seconds=180,
+        target_staff_utilization=0.82
+    )